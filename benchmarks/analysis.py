@@ -0,0 +1,83 @@
+"""
+Archive analysis check. Writes a PDN archive of self-play games, runs
+checkers.analysis over it once straight through, then again
+interrupted with SIGINT part way and resumed, and checks both outputs
+are identical. Reports positions/s and the peak memory of the
+pipeline process.
+
+Usage: python -m benchmarks.analysis [games] [workers]
+"""
+import os
+import sys
+import time
+import random
+import signal
+import resource
+import tempfile
+import subprocess
+from checkers import pdn
+from checkers.bitboard import Position
+from checkers.constants import PLAYER_RED
+
+DEPTH = 4
+
+def randomArchive(path: str, games: int) -> None:
+    """
+    Writes games of random moves as PDN.
+    """
+    rng = random.Random(0)
+    with open(path, "w") as file:
+        for game in range(games):
+            position, moves = Position.initial(), []
+            while len(moves) < 120 and position.legalMoves():
+                moves.append(rng.choice(position.legalMoves()))
+                position = position.play(moves[-1])
+            winner = None
+            if not position.legalMoves(): # Side to move has lost
+                winner = "white" if position.turn == PLAYER_RED else "red"
+            record = {"game": game, "moves": [list(move) for move in moves], "winner": winner}
+            played, result = pdn.selfPlayGame(record)
+            pdn.writeGame(file, played, result, {"Round": game})
+
+def analyse(archive: str, out: str, workers: int, resume: bool = False, interruptAfter: float|None = None) -> tuple:
+    """
+    Runs the pipeline. Returns (exit code, seconds, stderr lines).
+    """
+    command = [sys.executable, "-m", "checkers.analysis", archive, "--out", out,
+               "--workers", str(workers), "--depth", str(DEPTH)] + (["--resume"] if resume else [])
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True)
+    if interruptAfter is not None:
+        time.sleep(interruptAfter)
+        process.send_signal(signal.SIGINT)
+    _, errors = process.communicate()
+    return process.returncode, time.perf_counter() - start, errors.splitlines()
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, "games.pdn")
+        straight, resumed = os.path.join(directory, "straight.jsonl"), os.path.join(directory, "resumed.jsonl")
+        randomArchive(archive, games)
+
+        code, seconds, report = analyse(archive, straight, workers)
+        assert code == 0, report
+        with open(straight) as file:
+            positions = sum(1 for _ in file)
+        print("straight run: {} positions in {:.1f}s, {:.0f} positions/s".format(positions, seconds, positions / seconds))
+        print("last report: {}".format(report[-1]))
+        print("peak memory of a pipeline process: {:.1f} MB".format(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024))
+
+        code, _, report = analyse(archive, resumed, workers, interruptAfter=seconds / 2)
+        with open(resumed + ".checkpoint") as file:
+            print("interrupted (exit {}) at checkpoint {}".format(code, file.read()))
+        code, _, report = analyse(archive, resumed, workers, resume=True)
+        assert code == 0, report
+        with open(straight) as first, open(resumed) as second:
+            assert first.read() == second.read(), "resumed output differs"
+        print("resumed output identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Batched move generation check. Collects positions from random games,
+checks that checkers.batch returns the same legal moves as MoveTree
+(through Board.legalMoves) and bitboard.Position for every one, then
+compares throughput against per-position generation.
+
+Usage: python -m benchmarks.batch [positions]
+"""
+import sys
+import time
+import random
+import numpy as np
+from checkers import batch
+from checkers.board import Board
+from checkers.bitboard import Position, COORDS, fromMove
+
+LETTERS = {batch.EMPTY: ".", batch.RED_MAN: "r", batch.RED_KING: "R",
+           batch.WHITE_MAN: "w", batch.WHITE_KING: "W"}
+
+def collect(count: int, rng: random.Random) -> list:
+    """
+    Returns count positions reached by random play.
+    """
+    positions = []
+    while len(positions) < count:
+        position = Position.initial()
+        for _ in range(rng.randrange(1, 120)):
+            moves = position.legalMoves()
+            if not moves:
+                break
+            position = position.play(rng.choice(moves))
+        positions.append(position)
+    return positions
+
+def toArray(position: Position) -> np.ndarray:
+    """
+    Returns the 8x8 array of square codes of a position.
+    """
+    codes = np.zeros((8, 8), dtype=np.int8)
+    for square, (row, col) in enumerate(COORDS):
+        bit = 1 << square
+        king = bool(position.kings & bit)
+        if position.white & bit:
+            codes[row, col] = batch.WHITE_KING if king else batch.WHITE_MAN
+        elif position.red & bit:
+            codes[row, col] = batch.RED_KING if king else batch.RED_MAN
+    return codes
+
+def toBoard(codes: np.ndarray) -> Board:
+    """
+    Returns the Board of an 8x8 array of square codes.
+    """
+    return Board.fromDiagram("\n".join("".join(LETTERS[code] for code in row) for row in codes.tolist()))
+
+def grouped(moves: batch.BatchMoves, count: int) -> list:
+    """
+    Returns one set of (origin, target, captured) moves per position.
+    """
+    sets = [set() for _ in range(count)]
+    for index, origin, target, captured in zip(*(values.tolist() for values in moves)):
+        sets[index].add((origin, target, captured))
+    return sets
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    positions = collect(count, random.Random(0))
+    arrays = batch.packPositions(positions)
+    boards = np.stack([toArray(position) for position in positions])
+
+    found = grouped(batch.legalMoves(*arrays), count)
+    assert found == grouped(batch.legalMovesOfBoards(boards, arrays[3]), count)
+    for position, codes, moves in zip(positions, boards, found):
+        tree = {fromMove(move) for move in toBoard(codes).legalMoves(position.turn)}
+        assert moves == tree, (position, moves ^ tree)
+        assert moves == set(position.legalMoves())
+    print("{} positions, {} moves: batch matches".format(count, sum(map(len, found))))
+
+    start = time.perf_counter()
+    batch.legalMoves(*arrays)
+    batchSeconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for position in positions:
+        position.legalMoves()
+    loopSeconds = time.perf_counter() - start
+    print("{:<10} {:>10} {:>12}".format("engine", "seconds", "positions/s"))
+    print("{:<10} {:>10.3f} {:>12.0f}".format("batch", batchSeconds, count / batchSeconds))
+    print("{:<10} {:>10.3f} {:>12.0f}".format("bitboard", loopSeconds, count / loopSeconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Bitboard engine benchmark. Cross-checks Position move generation
+against MoveTree.validMoves() over random games, then times a perft
+from the starting position with both generators.
+
+Usage: python -m benchmarks.bitboard [depth] [games]
+"""
+import sys
+import time
+import random
+from checkers.board import Board
+from checkers.moves import MoveTree
+from checkers.perft import perft
+from checkers.bitboard import Position, COORDS, squares
+from checkers.constants import PLAYER_RED, PLAYER_WHITE
+
+def crossCheck(games: int, seed: int = 0) -> tuple:
+    """
+    Plays random games and compares, piece by piece, the bitboard
+    moves with MoveTree's, then the whole-position legal moves with
+    Board.legalMoves(). Returns the number of pieces checked.
+    """
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(games):
+        board, position = Board(), Position.initial()
+        while position.white and position.red:
+            assert Position.fromBoard(board, position.turn) == position
+            own = position.white if position.turn == PLAYER_WHITE else position.red
+            for square in squares(own):
+                piece = board.getSquareContent(COORDS[square])
+                expected = MoveTree(piece, board).validMoves()
+                found = dict()
+                for _, target, captured in position.pieceMoves(square):
+                    found.setdefault(COORDS[target], set()).add(
+                        frozenset(COORDS[s] for s in squares(captured))
+                    )
+                for coords, captures in expected.items():
+                    assert frozenset(p.getCoords() for p in captures) in found[coords]
+                assert set(expected) == set(found)
+                checked += 1
+            moves = position.legalMoves()
+            expected = {(m.origin, m.target, frozenset(m.captures))
+                        for m in board.legalMoves(position.turn)}
+            found = {(COORDS[o], COORDS[t], frozenset(COORDS[s] for s in squares(c)))
+                     for o, t, c in moves}
+            assert expected == found
+            if not moves:
+                break
+            move = rng.choice(moves)
+            origin, target, captured = move
+            for square in squares(captured):
+                board.delete(COORDS[square])
+            board.move(board.getSquareContent(COORDS[origin]), COORDS[target])
+            position = position.play(move)
+    return checked
+
+def timed(function, *args) -> tuple:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    checked, elapsed = timed(crossCheck, games)
+    print("cross-check: {} pieces match ({:.1f}s)".format(checked, elapsed))
+    treeNodes, treeTime = timed(perft, Board(), PLAYER_RED, depth)
+    bitNodes, bitTime = timed(Position.initial().perft, depth)
+    assert treeNodes == bitNodes, (treeNodes, bitNodes)
+    print("perft({}) = {}".format(depth, bitNodes))
+    print("MoveTree: {:>10.0f} nodes/s".format(treeNodes / treeTime))
+    print("bitboard: {:>10.0f} nodes/s".format(bitNodes / bitTime))
+    print("speedup:  {:>10.1f}x".format(treeTime / bitTime))
+
+if __name__ == "__main__":
+    main()
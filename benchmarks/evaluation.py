@@ -0,0 +1,87 @@
+"""
+Incremental evaluation check. Plays random games on both rules
+variants, taking moves back now and then, and checks after every
+make and unmake that the score Board keeps up to date equals a full
+evaluation from scratch. On 8x8, the bitboard Position played along
+must carry the same score, which search.evaluate reads. Then
+measures evaluations per second of both.
+
+Usage: python -m benchmarks.evaluation [games]
+"""
+import sys
+import time
+import random
+from checkers.board import Board
+from checkers.search import evaluate
+from checkers.bitboard import Position, fromMove
+from checkers.evaluation import evaluateBoard
+from checkers.rules import CHECKERS, INTERNATIONAL
+from checkers.constants import PLAYER_RED, PLAYER_WHITE
+
+MAX_PLIES = 200
+
+def check(board: Board, positions: list, player: int) -> None:
+    for view in (PLAYER_RED, PLAYER_WHITE):
+        assert board.evaluate(view) == evaluateBoard(board, view), (board.toDiagram(), board.score)
+    if positions:
+        assert positions[-1].score == board.score == Position.fromBoard(board, player).score, board.toDiagram()
+        assert evaluate(positions[-1]) == board.evaluate(player)
+
+def randomGame(rules, rng: random.Random) -> tuple:
+    """
+    Plays and checks one random game. Returns (plies, boards
+    reached), boards reached being kept for the speed test.
+    """
+    board = Board(rules)
+    start = board.score
+    positions = [Position.fromBoard(board, PLAYER_RED)] if rules == CHECKERS else [] # Played along
+    player, plies, boards = PLAYER_RED, 0, []
+    while plies < MAX_PLIES:
+        moves = board.legalMoves(player)
+        if not moves:
+            break
+        move = rng.choice(moves)
+        board.makeMove(move, player)
+        if positions:
+            positions.append(positions[-1].play(fromMove(move)))
+        player = 1 - player
+        plies += 1
+        check(board, positions, player)
+        if rng.random() < 0.1: # Take back a move and play on from there
+            board.unmakeMove()
+            positions = positions[:-1]
+            player = 1 - player
+            check(board, positions, player)
+        boards.append(board.toDiagram())
+    while board.history:
+        board.unmakeMove()
+        positions = positions[:-1]
+        player = 1 - player
+        check(board, positions, player)
+    assert board.score == start
+    return plies, boards
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rng = random.Random(0)
+    print("{:<14} {:>6} {:>7} {:>14} {:>14}".format("variant", "games", "plies", "incremental/s", "scratch/s"))
+    for rules in (CHECKERS, INTERNATIONAL):
+        plies, diagrams = 0, []
+        for _ in range(games):
+            played, reached = randomGame(rules, rng)
+            plies += played
+            diagrams.extend(reached[::10])
+        boards = [Board.fromDiagram(diagram, rules) for diagram in diagrams]
+        start = time.perf_counter()
+        for _ in range(10):
+            for board in boards:
+                board.evaluate(PLAYER_RED)
+        incremental = 10 * len(boards) / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for board in boards:
+            evaluateBoard(board, PLAYER_RED)
+        scratch = len(boards) / (time.perf_counter() - start)
+        print("{:<14} {:>6} {:>7} {:>14.0f} {:>14.0f}".format(rules.name, games, plies, incremental, scratch))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Import-time benchmark. Spawns fresh interpreters, like the
+analysis workers do, and compares importing the headless
+rules core with importing the pygame front end.
+
+Usage: python -m benchmarks.import_time [runs]
+"""
+import os
+import sys
+import subprocess
+import time
+
+STATEMENTS = {
+    "interpreter": "pass",
+    "checkers.moves": "import checkers.moves",
+    "checkers.game": "import checkers.game",
+    "checkers.gui": "import pygame; pygame.init(); import checkers.gui",
+}
+
+def timeImport(statement: str, runs: int) -> float:
+    """
+    Returns the best wall time, in seconds, of running
+    statement in a fresh interpreter.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    baseline = timeImport(STATEMENTS["interpreter"], runs)
+    print("{:<16} {:>10} {:>10}".format("import", "total ms", "extra ms"))
+    for name, statement in STATEMENTS.items():
+        total = timeImport(statement, runs)
+        print("{:<16} {:>10.1f} {:>10.1f}".format(name, total * 1000, (total - baseline) * 1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Jump chain enumeration check. Builds positions where a red man or
+king faces a growing lattice of white men, and checks that MoveTree
+builds exactly one node per distinct jump chain state (landing
+square, captured pieces), so work stays linear in the number of
+distinct chains, and that every sequence it reports runs to the end
+of its chain: none can be extended with another capture.
+
+Usage: python -m benchmarks.jump_chains [samples]
+"""
+import sys
+import random
+from checkers.board import Board
+from checkers.moves import MoveTree
+from checkers.constants import PLAYER_RED
+
+LATTICE = [(row, col) for row in (1, 3, 5) for col in (2, 4, 6)] # Capturable squares
+START = (6, 3)
+
+def diagram(men: list, piece: str) -> str:
+    """
+    Returns a diagram with white men on men and piece on START.
+    """
+    rows = [["."] * 8 for _ in range(8)]
+    for row, col in men:
+        rows[row][col] = "w"
+    rows[START[0]][START[1]] = piece
+    return "\n".join("".join(row) for row in rows)
+
+def extendable(board: Board, king: bool, landing: tuple, captured: set) -> bool:
+    """
+    Checks if a red piece that jumped captured and stands on
+    landing has another capture, by the MoveTree rules: kings
+    pass over jumped pieces, the piece's start square blocks.
+    """
+    directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)] if king else [(-1, 1), (-1, -1)]
+    for rowDir, colDir in directions:
+        row, col = landing
+        while True:
+            row, col = row + rowDir, col + colDir
+            if not (0 <= row < 8 and 0 <= col < 8):
+                break
+            content = board.getSquareContent((row, col))
+            if content is None or (row, col) in captured:
+                if king:
+                    continue
+                break
+            if content.getOwner() != PLAYER_RED:
+                behind = (row + rowDir, col + colDir)
+                if 0 <= behind[0] < 8 and 0 <= behind[1] < 8 and board.getSquareContent(behind) is None:
+                    return True
+            break
+    return False
+
+def measure(men: list, piece: str) -> tuple:
+    """
+    Returns (distinct chains, nodes built) for the piece on START,
+    checking its sequences are complete.
+    """
+    board = Board.fromDiagram(diagram(men, piece))
+    stats = MoveTree.enableStats()
+    tree = MoveTree(board.getSquareContent(START), board)
+    moves = tree.moveList()
+    MoveTree.disableStats()
+    for sequence in tree.sequences():
+        landing, jumped = sequence[-1]
+        if jumped is None: # Quiet move
+            continue
+        captured = {jumped for _, jumped in sequence}
+        assert not extendable(board, piece == "R", landing, captured), (men, piece, sequence)
+    return len(moves), stats.nodes
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rng = random.Random(0)
+    print("{:<5} {:>5} {:>10} {:>10} {:>10}".format("piece", "men", "chains", "nodes", "nodes/chain"))
+    for piece in ("r", "R"):
+        for count in range(1, len(LATTICE) + 1):
+            chains = nodes = 0
+            for _ in range(samples):
+                found, built = measure(rng.sample(LATTICE, count), piece)
+                assert built == found, (built, found)
+                chains += found
+                nodes += built
+            print("{:<5} {:>5} {:>10} {:>10} {:>10.2f}".format(
+                "king" if piece == "R" else "man", count, chains, nodes,
+                nodes / chains if chains else 0.0))
+
+if __name__ == "__main__":
+    main()
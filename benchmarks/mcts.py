@@ -0,0 +1,89 @@
+"""
+MCTS benchmark. Reports playouts per second and tree memory by
+batch size, in process and across a pool of workers. Checks that the
+node cap holds, however small, and measures how much of the tree is
+reused between moves. Then plays a kings endgame where MCTS, three
+kings up against one, meets the alpha-beta search.
+
+Usage: python -m benchmarks.mcts [playouts] [workers]
+"""
+import sys
+import time
+from checkers.mcts import Mcts
+from checkers.board import Board
+from checkers.search import Search
+from checkers.bitboard import Position
+from checkers.constants import PLAYER_RED, PLAYER_WHITE
+
+KINGS_ENDGAME = """
+    ........
+    ..R.....
+    ........
+    ......W.
+    ........
+    R.......
+    ........
+    ....R...
+"""
+ENDGAME_PLIES = 100
+
+def speed(playouts: int, workers: int) -> None:
+    print("{:>7} {:>7} {:>10} {:>10} {:>10} {:>10}".format(
+        "workers", "batch", "playouts/s", "nodes", "KB", "bytes/node"))
+    for batch, pool in ((1, 0), (8, 0), (32, 0), (32, workers))[:4 if workers else 3]:
+        with Mcts(maxPlayouts=playouts, batch=batch, workers=pool, seed=0) as mcts:
+            mcts.search(Position.initial())
+            print("{:>7} {:>7} {:>10.0f} {:>10} {:>10.1f} {:>10.1f}".format(
+                pool, batch, mcts.playoutsPerSecond(), len(mcts.tree),
+                mcts.memoryBytes() / 1024, mcts.memoryBytes() / len(mcts.tree)))
+
+def nodeCap(playouts: int) -> None:
+    """
+    Checks the node cap, caps smaller than the root
+    and its children still expanding the root.
+    """
+    moves = Position.initial().legalMoves()
+    for cap in (1, 5, 500):
+        mcts = Mcts(maxPlayouts=playouts, maxNodes=cap, seed=0)
+        result = mcts.search(Position.initial())
+        assert len(mcts.tree) <= max(cap, 1 + len(moves)) and result.bestMove in moves
+        print("node cap {}: {} nodes after {} playouts".format(cap, len(mcts.tree), mcts.playouts))
+    result = Mcts(maxPlayouts=0).search(Position.initial())
+    assert result.bestMove in moves
+
+def reuse(playouts: int, plies: int = 10) -> None:
+    """
+    Plays MCTS against itself, reporting the share
+    of each new search's tree kept from the last one.
+    """
+    mcts = Mcts(maxPlayouts=playouts, seed=0)
+    position, kept = Position.initial(), []
+    for _ in range(plies):
+        result = mcts.search(position)
+        kept.append(mcts.reused / len(mcts.tree))
+        position = position.play(result.bestMove)
+    print("tree reuse over {} plies: {:.0%} of each tree kept on average".format(plies, sum(kept[1:]) / (plies - 1)))
+
+def endgame(playouts: int, games: int = 3) -> None:
+    wins, start = 0, time.perf_counter()
+    for game in range(games):
+        position = Position.fromBoard(Board.fromDiagram(KINGS_ENDGAME), PLAYER_RED)
+        engines = {PLAYER_RED: Mcts(maxPlayouts=playouts, seed=game), PLAYER_WHITE: Search(maxNodes=2000)}
+        for ply in range(ENDGAME_PLIES):
+            if not position.legalMoves():
+                wins += position.turn == PLAYER_WHITE
+                break
+            position = position.play(engines[position.turn].search(position).bestMove)
+    print("kings endgame, MCTS 3 kings against search 1 king: {}/{} won, {:.1f}s".format(
+        wins, games, time.perf_counter() - start))
+
+def main():
+    playouts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    speed(playouts, workers)
+    nodeCap(playouts)
+    reuse(playouts // 2)
+    endgame(playouts // 2)
+
+if __name__ == "__main__":
+    main()
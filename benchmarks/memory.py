@@ -0,0 +1,97 @@
+"""
+Position memory benchmark. Measures with tracemalloc the memory of
+positions held as Boards of the former Piece layout (per-instance
+__dict__ with colour, pixel position and selection flag), as Boards
+of the current __slots__ Piece, as bitboard Positions and as packed
+codec records, projected to a million positions.
+
+Usage: python -m benchmarks.memory [sample] [count]
+"""
+import sys
+import random
+import tracemalloc
+from checkers import codec
+from checkers.board import Board
+from checkers.bitboard import Position
+from checkers.constants import SQUARE_SIZE, BEIGE, RED, PLAYER_WHITE
+
+class LegacyPiece:
+    """
+    Storage layout of Piece before rendering state moved to the GUI.
+    """
+
+    def __init__(self, color, player, row, col) -> None:
+        self.color = color
+        self.player = player
+        self.king: bool = False
+        self.row: int = row
+        self.col: int = col
+        self.position: tuple = (row * SQUARE_SIZE + SQUARE_SIZE // 2, col * SQUARE_SIZE + SQUARE_SIZE // 2)
+        self.selected = False
+
+def legacyBoard(position: Position) -> Board:
+    """
+    Returns a Board of position holding LegacyPieces.
+    """
+    board = position.toBoard()
+    for player in board.pieces:
+        legacy = dict()
+        for piece in board.pieces[player]:
+            old = LegacyPiece(BEIGE if player == PLAYER_WHITE else RED, player, piece.row, piece.col)
+            old.king = piece.king
+            board.board[piece.row][piece.col] = old
+            legacy[old] = None
+        board.pieces[player] = legacy
+    return board
+
+def collect(count: int, rng: random.Random) -> list:
+    positions = []
+    while len(positions) < count:
+        position = Position.initial()
+        for _ in range(rng.randrange(1, 80)):
+            moves = position.legalMoves()
+            if not moves:
+                break
+            position = position.play(rng.choice(moves))
+        positions.append(position)
+    return positions
+
+def measure(build, positions: list) -> float:
+    """
+    Returns the bytes per position held by build(position).
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [build(position) for position in positions]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return size / len(positions)
+
+def packed(positions: list) -> bytearray:
+    """
+    Returns all positions as one buffer of codec records.
+    """
+    buffer = bytearray()
+    for position in positions:
+        buffer += codec.encode(position)
+    return buffer
+
+def main():
+    sample = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    positions = collect(sample, random.Random(0))
+    layouts = [
+        ("Board, former Piece", measure(legacyBoard, positions)),
+        ("Board, __slots__ Piece", measure(Position.toBoard, positions)),
+        ("bitboard Position", measure(lambda position: Position(*position.key()), positions)),
+        ("codec record", codec.POSITION.size),
+    ]
+    print("{:<24} {:>10} {:>14}".format("layout", "bytes", "MB per {:g}".format(count)))
+    for name, perPosition in layouts:
+        print("{:<24} {:>10.0f} {:>14.1f}".format(name, perPosition, perPosition * count / 2**20))
+    buffer = packed(positions)
+    assert all(codec.decode(buffer, i * codec.POSITION.size) == position for i, position in enumerate(positions))
+
+if __name__ == "__main__":
+    main()
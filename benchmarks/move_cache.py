@@ -0,0 +1,48 @@
+"""
+Move cache check. Plays random games with take-backs through Game,
+whose board goes through a MoveCache, checking every cached legal
+move list against a fresh MoveTree one. Then runs perft with a range
+of cache sizes and reports hit rates and speed, to size the cache.
+
+Usage: python -m benchmarks.move_cache [games] [depth]
+"""
+import sys
+import random
+from checkers.game import Game
+from checkers.moves import MoveCache
+from checkers.perft import runPerft
+
+def check(games: int, rng: random.Random) -> int:
+    """
+    Returns the number of positions checked.
+    """
+    checked = 0
+    for _ in range(games):
+        game = Game()
+        game.enableMoveCache()
+        while not game.endGame and len(game.board.history) < 150:
+            cached = game.legalMoves()
+            game.board.moveCache = None
+            assert cached == game.board.legalMoves(game.turn)
+            game.board.moveCache = game.moveCache
+            checked += 1
+            if game.board.history and rng.random() < 0.2:
+                game.unmakeMove()
+            else:
+                game.playMove(rng.choice(cached))
+    return checked
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    print("{} positions match".format(check(games, random.Random(0))))
+    print("{:>8} {:>10} {:>8} {:>10} {:>8}".format("size", "hits", "hit rate", "evictions", "seconds"))
+    for size in (0, 256, 4096, 65536):
+        cache = MoveCache(size) if size else None
+        nodes, seconds = runPerft("initial", depth, "tree", cache)
+        stats = cache.asDict() if cache else {"hits": 0, "hitRate": 0.0, "evictions": 0}
+        print("{:>8} {:>10} {:>8.2f} {:>10} {:>8.2f}".format(
+            size, stats["hits"], stats["hitRate"], stats["evictions"], seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Parallel search benchmark. Searches positions to a fixed depth with
+the sequential Search and with ParallelSearch for a range of worker
+counts, checks that every search returns the sequential best move
+and score, and reports the speedup against worker count.
+
+Usage: python -m benchmarks.parallel_search [depth] [max workers]
+"""
+import sys
+import time
+import random
+import multiprocessing
+from checkers.bitboard import Position
+from checkers.search import Search
+from checkers.parallel import ParallelSearch
+
+def positions(count: int, rng: random.Random) -> list:
+    """
+    Returns the initial position and count positions of random play.
+    """
+    found = [Position.initial()]
+    while len(found) <= count:
+        position = Position.initial()
+        for _ in range(rng.randrange(6, 30)):
+            moves = position.legalMoves()
+            if not moves:
+                break
+            position = position.play(rng.choice(moves))
+        if position.legalMoves():
+            found.append(position)
+    return found
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    maxWorkers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, multiprocessing.cpu_count())
+    tests = positions(4, random.Random(0))
+
+    start = time.perf_counter()
+    expected = [Search(maxDepth=depth).search(position) for position in tests]
+    sequential = time.perf_counter() - start
+    print("{} cpus, {} positions, depth {}".format(multiprocessing.cpu_count(), len(tests), depth))
+    print("{:<10} {:>8} {:>10} {:>8}".format("workers", "seconds", "nodes", "speedup"))
+    print("{:<10} {:>8.2f} {:>10} {:>8.2f}".format(
+        "sequential", sequential, sum(result.nodes for result in expected), 1.0))
+    workers = 1
+    while workers <= maxWorkers:
+        with ParallelSearch(workers, maxDepth=depth) as search:
+            start = time.perf_counter()
+            results = [search.search(position) for position in tests]
+            seconds = time.perf_counter() - start
+        for result, reference in zip(results, expected):
+            assert (result.bestMove, result.score) == (reference.bestMove, reference.score), (result, reference)
+        print("{:<10} {:>8.2f} {:>10} {:>8.2f}".format(
+            workers, seconds, sum(result.nodes for result in results), sequential / seconds))
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
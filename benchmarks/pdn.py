@@ -0,0 +1,61 @@
+"""
+PDN and codec check. Plays random games, writes them as PDN to a
+file, streams them back and checks every move and position against
+the originals, round-tripping each position through the packed codec.
+Reports games per second and the peak memory of the streaming read,
+which stays flat as the number of games grows.
+
+Usage: python -m benchmarks.pdn [games]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+from checkers import codec, pdn
+from checkers.game import Game
+from checkers.bitboard import Position
+
+def randomGame(rng: random.Random) -> Game:
+    game = Game()
+    while not game.endGame and len(game.board.history) < 200:
+        game.playMove(rng.choice(game.legalMoves()))
+    return game
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.pdn")
+        games = []
+        start = time.perf_counter()
+        with open(path, "w") as out:
+            for number in range(count):
+                game = randomGame(rng)
+                pdn.saveGame(game, out, {"Round": number})
+                games.append([undo.move for undo in game.board.history])
+        writeSeconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tracemalloc.start()
+        plies = 0
+        with open(path) as file:
+            for record, moves in zip(pdn.readGames(file), games):
+                replayed = []
+                for board, player, move in pdn.replay(record):
+                    position = Position.fromBoard(board, player)
+                    assert codec.decode(codec.encode(position)) == position
+                    assert codec.unpackKey(codec.packKey(position)) == position
+                    replayed.append(move)
+                assert replayed == moves
+                plies += len(moves)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        readSeconds = time.perf_counter() - start
+        print("{} games, {} plies, {} bytes of PDN".format(count, plies, os.path.getsize(path)))
+        print("write {:.0f} games/s, read and replay {:.0f} games/s, peak {:.0f} KB".format(
+            count / writeSeconds, count / readSeconds, peak / 1024))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Game server load test. Starts a GameServer on a free local port (or
+uses a running one), parks a crowd of idle sessions and reports their
+memory, checks malformed requests get protocol errors, then has
+concurrent clients play random games and reports move latency
+percentiles and throughput.
+
+Usage: python -m benchmarks.server [--clients N] [--games N] [--idle N] [--host H --port P]
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import tracemalloc
+from checkers.server import GameServer
+
+class Client:
+    """
+    Minimal protocol client: one request in flight at a time,
+    pushed diffs of other clients' moves are skipped.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.nextId = 0
+
+    async def request(self, **request) -> dict:
+        self.nextId += 1
+        request["id"] = self.nextId
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        while True:
+            reply = json.loads(await self.reader.readline())
+            if reply.get("id") == self.nextId:
+                return reply
+
+async def player(host: str, port: int, games: int, seed: int, latencies: list) -> None:
+    """
+    Plays games of random moves, recording the latency of each move.
+    """
+    rng = random.Random(seed)
+    client = Client(*await asyncio.open_connection(host, port))
+    for _ in range(games):
+        state = await client.request(op="new")
+        game = state["game"]
+        while not state["end"]:
+            start = time.perf_counter()
+            state = await client.request(op="move", game=game, move=rng.choice(state["moves"]))
+            latencies.append(time.perf_counter() - start)
+            assert state["ok"], state
+        await client.request(op="close", game=game)
+    client.writer.close()
+
+MALFORMED = [ # Request line, error expected
+    (b"nope", "request must be JSON"),
+    (b"[1]", "request must be an object"),
+    (b'{"op": "join", "game": [1]}', "game must be an integer"),
+    (b'{"op": "state", "game": 0}', "no game 0"), # Ids start at 1
+    (b'{"op": "move", "game": 1, "move": 5}', "move must be a string"),
+    (b'{"op": "fly"}', "unknown op fly"),
+]
+
+async def malformed(host: str, port: int) -> None:
+    """
+    Sends malformed requests, checking each gets its protocol error.
+    """
+    client = Client(*await asyncio.open_connection(host, port))
+    game = (await client.request(op="new"))["game"]
+    for line, error in MALFORMED:
+        client.writer.write(line.replace(b": 1,", ": {},".format(game).encode()) + b"\n")
+        await client.writer.drain()
+        reply = json.loads(await client.reader.readline())
+        assert reply == {"ok": False, "error": error}, (line, reply)
+    await client.request(op="close", game=game)
+    client.writer.close()
+    print("{} malformed requests answered with protocol errors".format(len(MALFORMED)))
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+async def run(args) -> None:
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        tracemalloc.start()
+        server = GameServer("127.0.0.1", 0)
+        await server.start()
+        host, port = server.host, server.port
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(args.idle):
+            server.newSession()
+        server.parkIdle(0)
+        idleBytes = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print("{} idle sessions parked, {:.0f} bytes each".format(args.idle, idleBytes / max(1, args.idle)))
+
+    await malformed(host, port)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(player(host, port, args.games, seed, latencies) for seed in range(args.clients)))
+    seconds = time.perf_counter() - start
+    print("{} clients, {} games, {} moves in {:.2f}s, {:.0f} moves/s".format(
+        args.clients, args.clients * args.games, len(latencies), seconds, len(latencies) / seconds))
+    print("move latency p50 {:.2f} ms, p99 {:.2f} ms, max {:.2f} ms".format(
+        1000 * percentile(latencies, 0.5), 1000 * percentile(latencies, 0.99), 1000 * max(latencies)))
+    if server is not None:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Game server load test.")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--games", type=int, default=2)
+    parser.add_argument("--idle", type=int, default=5000, help="idle sessions to create first")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="use a running server")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Tablebase check. Generates (or reuses) a tablebase, then checks that
+every stored value agrees with the values of its successors: a win
+has a losing successor, a loss has only winning ones, a draw has no
+losing successor and a drawn one. Reports probes per second.
+
+A temporary directory is used unless one is given.
+
+Usage: python -m benchmarks.tablebase [directory] [pieces]
+"""
+import sys
+import time
+import tempfile
+from checkers import tablebase
+from checkers.tablebase import Tablebase, WIN, LOSS, DRAW
+
+def check(base: Tablebase, pieces: int) -> int:
+    """
+    Checks every position of every table. Returns the number checked.
+    """
+    checked = 0
+    for signature in tablebase.signatures(pieces):
+        for position in tablebase.positions(signature):
+            value = base.probe(position)
+            children = {base.probe(position.play(move)) for move in position.legalMoves()}
+            if value == WIN:
+                assert LOSS in children, position
+            elif value == LOSS:
+                assert children <= {WIN}, position
+            else:
+                assert value == DRAW and LOSS not in children and DRAW in children, position
+            checked += 1
+    return checked
+
+def run(directory: str, pieces: int) -> None:
+    tablebase.generate(directory, pieces)
+    base = Tablebase(directory)
+    print("{} positions consistent".format(check(base, pieces)))
+
+    probes = [position for signature in tablebase.signatures(pieces)
+              for position in tablebase.positions(signature)]
+    start = time.perf_counter()
+    for position in probes:
+        base.probe(position)
+    seconds = time.perf_counter() - start
+    print("{} probes in {:.2f}s, {:.0f} probes/s".format(len(probes), seconds, len(probes) / seconds))
+    base.close()
+
+def main():
+    pieces = int(sys.argv[2]) if len(sys.argv) > 2 else tablebase.PIECES
+    if len(sys.argv) > 1:
+        run(sys.argv[1], pieces)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            run(directory, pieces)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Rules variants check. Plays international draughts rules on small
+10x10 positions (men capturing backwards, flying king landings,
+majority capture, chains through the starting square, no promotion
+in passing), then compares MoveTree speed on the 8x8 and 10x10 initial
+positions: perft nodes per second, and legalMoves time per piece
+moved, which the precomputed square tables keep independent of the
+board size.
+
+Usage: python -m benchmarks.variants
+"""
+import time
+from checkers.board import Board
+from checkers.perft import perft
+from checkers.rules import CHECKERS, INTERNATIONAL
+from checkers.constants import PLAYER_RED
+
+def board(pieces: dict, rules=INTERNATIONAL) -> Board:
+    """
+    Returns a board holding pieces, coords -> diagram char.
+    """
+    rows = [["."] * rules.size for _ in range(rules.size)]
+    for (row, col), char in pieces.items():
+        rows[row][col] = char
+    return Board.fromDiagram("\n".join("".join(row) for row in rows), rules)
+
+def checkRules() -> None:
+    # A red man captures backwards
+    moves = board({(5, 4): "r", (6, 5): "w", (0, 1): "w"}).legalMoves(PLAYER_RED)
+    assert [(move.origin, move.target) for move in moves] == [((5, 4), (7, 6))], moves
+    # A king may stop on any free square behind the captured man
+    moves = board({(9, 0): "R", (6, 3): "w"}).legalMoves(PLAYER_RED)
+    assert sorted(move.target for move in moves) == [(0, 9), (1, 8), (2, 7), (3, 6), (4, 5), (5, 4)], moves
+    # Only the chain taking the most pieces is legal
+    moves = board({(6, 5): "r", (5, 4): "w", (3, 2): "w", (6, 9): "r", (5, 8): "w"}).legalMoves(PLAYER_RED)
+    assert [(move.target, len(move.captures)) for move in moves] == [((2, 1), 2)], moves
+    # A king chain may cross and end on its starting square
+    moves = board({(3, 2): "R", (4, 3): "w", (4, 5): "w", (2, 5): "w", (2, 3): "w"}).legalMoves(PLAYER_RED)
+    assert moves and all(len(move.captures) == 4 for move in moves), moves
+    assert any(move.target == (3, 2) for move in moves), moves
+    # A man passing the last row in a chain is not promoted
+    game = board({(2, 5): "r", (1, 4): "w", (1, 2): "w", (9, 0): "w"})
+    moves = game.legalMoves(PLAYER_RED)
+    assert [(move.target, len(move.captures)) for move in moves] == [((2, 1), 2)], moves
+    game.makeMove(moves[0], PLAYER_RED)
+    assert not game.getSquareContent((2, 1)).king
+    game.unmakeMove()
+    # The 8x8 variant is unchanged: a king chain cannot land on its starting square
+    moves = board({(3, 2): "R", (4, 3): "w", (4, 5): "w", (2, 5): "w", (2, 3): "w"}, CHECKERS).legalMoves(PLAYER_RED)
+    assert moves and all(move.target != (3, 2) for move in moves), moves
+
+def piecesTime(rules, calls: int = 2000) -> float:
+    """
+    Returns the legalMoves time per piece of the side
+    to move on the initial position, in microseconds.
+    """
+    initial = Board(rules)
+    start = time.perf_counter()
+    for _ in range(calls):
+        initial.legalMoves(PLAYER_RED)
+    return (time.perf_counter() - start) / calls / initial.countPieces(PLAYER_RED) * 1e6
+
+def main():
+    checkRules()
+    print("rules ok")
+    print("{:<14} {:>5} {:>10} {:>8} {:>10} {:>8}".format("variant", "depth", "nodes", "seconds", "nodes/s", "us/piece"))
+    for rules, depth in ((CHECKERS, 6), (INTERNATIONAL, 5)):
+        start = time.perf_counter()
+        nodes = perft(Board(rules), PLAYER_RED, depth)
+        seconds = time.perf_counter() - start
+        print("{:<14} {:>5} {:>10} {:>8.2f} {:>10.0f} {:>8.2f}".format(
+            rules.name, depth, nodes, seconds, nodes / seconds, piecesTime(rules)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Game archive analysis. Streams games from PDN or self-play JSONL files,
+replays them on a Board, checking every move against the MoveTree
+rules, and fans their positions out to a pool of workers that search
+each one. The output has one JSON line per position, in archive order:
+FEN, move played, engine score and best move, score of the move
+played, and a blunder flag when it loses more than a threshold.
+
+At most --window positions are in flight, and results are written as
+soon as every earlier one is, so memory stays bounded whatever the
+archive size. A checkpoint records the games fully written and the
+output length; --resume truncates the output to it and skips those
+games, and a run without --resume deletes it. Progress goes to
+stderr: positions/s, positions being searched and positions
+searched but waiting for an earlier one.
+
+Usage: python -m checkers.analysis [--out FILE] [--workers N] [--depth N]
+                                   [--blunder SCORE] [--resume] FILE ...
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from . import pdn, parallel
+from .board import Board
+from .moves import MoveCache
+from .bitboard import Position, fromMove
+from .search import WIN_SCORE
+from .constants import PLAYER_RED
+
+DEPTH = 6
+BLUNDER = 150 # Score lost by a blunder, in hundredths of a man
+REPORT_EVERY = 5.0 # Seconds between progress lines
+REPLAY_CACHE = 65536 # Move lists cached while replaying: games share openings
+
+# Games -------------------------------------------------------------------
+def readArchive(path: str):
+    """
+    Yields the game records of a file, one at a time: a PdnGame,
+    or for a self-play .jsonl file, the text of a JSON line.
+    Records are only read, gamePositions() replays them.
+    """
+    with open(path) as file:
+        if path.endswith(".jsonl"):
+            yield from (line for line in file if line.strip())
+        else:
+            yield from pdn.readGames(file)
+
+def gamePositions(record, cache: MoveCache|None = None) -> list:
+    """
+    Replays a game record on a Board, through cache if given.
+    Returns a (FEN, position key, move played) task for each
+    position before a move. Raises PdnError, or ValueError
+    for a bad JSON line.
+    """
+    if isinstance(record, pdn.PdnGame):
+        return [(pdn.toFen(board, player), Position.fromBoard(board, player).key(), move)
+                for board, player, move in pdn.replay(record, cache)]
+    moves, _ = pdn.selfPlayGame(json.loads(record), cache)
+    board, player, tasks = Board(), PLAYER_RED, []
+    for move in moves:
+        tasks.append((pdn.toFen(board, player), Position.fromBoard(board, player).key(), move))
+        board.makeMove(move, player)
+        player = 1 - player
+    return tasks
+
+# Workers -----------------------------------------------------------------
+def analyse(task: tuple) -> dict:
+    """
+    Searches a position. task is (FEN, position key, move
+    played). Returns the annotation, scores being from the
+    side to move's view.
+    """
+    fen, key, played = task
+    workerSearch = parallel.workerSearch # Built by parallel.initWorker
+    position = Position(*key)
+    result = workerSearch.search(position)
+    best = result.bestMove
+    playedScore = result.score
+    if fromMove(played) != best:
+        playedScore, _ = workerSearch.searchMove(position, fromMove(played), workerSearch.maxDepth,
+                                                 -WIN_SCORE - 1, WIN_SCORE + 1)
+    legalMoves = position.toBoard().legalMoves(position.turn)
+    bestMove = next(move for move in legalMoves if fromMove(move) == best)
+    return {
+        "fen": fen,
+        "move": pdn.formatMove(played),
+        "best": pdn.formatMove(bestMove),
+        "score": result.score,
+        "played": playedScore,
+        "loss": max(0, result.score - playedScore),
+    }
+
+# Pipeline ----------------------------------------------------------------
+class Analysis:
+    """
+    Runs the pipeline from files to out, an open output file,
+    from game skip on. Writes the checkpoint, a JSON file,
+    each time a game has been fully written.
+    """
+
+    def __init__(self, files: list, out, checkpoint: str, workers: int, depth: int = DEPTH,
+                 blunder: int = BLUNDER, window: int|None = None, skip: int = 0) -> None:
+        self.files: list = files
+        self.out = out
+        self.checkpoint: str = checkpoint
+        self.workers: int = workers
+        self.depth: int = depth
+        self.blunder: int = blunder
+        self.window: int = window or 4 * max(1, workers)
+        self.games: int = skip # Games fully written
+        self.positions: int = 0 # Positions written by this run
+        self.errors: int = 0
+        self.__cache: MoveCache = MoveCache(REPLAY_CACHE) # Shared by the games of this run
+        self.__pending: deque = deque() # (game, ply, last ply, result), in archive order
+        self.__start: float = 0.0
+        self.__lastReport: float = 0.0
+
+    def __tasks(self):
+        """
+        Yields (game, ply, last ply, task) for every
+        position of the games after the skipped ones.
+        """
+        game = 0
+        for path in self.files:
+            for record in readArchive(path):
+                game += 1
+                if game <= self.games:
+                    continue
+                try:
+                    tasks = gamePositions(record, self.__cache)
+                except (ValueError, KeyError) as error: # PdnError is a ValueError
+                    sys.stderr.write("{} game {}: {}\n".format(path, game, error))
+                    self.errors += 1
+                    continue
+                for ply, task in enumerate(tasks):
+                    yield game, ply + 1, ply + 1 == len(tasks), task
+
+    def __write(self, game: int, ply: int, last: bool, annotation: dict) -> None:
+        annotation = {"game": game, "ply": ply, **annotation, "blunder": annotation["loss"] >= self.blunder}
+        self.out.write(json.dumps(annotation, separators=(",", ":")) + "\n")
+        self.positions += 1
+        if last:
+            self.games = game
+            self.saveCheckpoint()
+
+    def saveCheckpoint(self) -> None:
+        """
+        Records the games written and the output length.
+        The file is replaced atomically.
+        """
+        self.out.flush()
+        os.fsync(self.out.fileno())
+        temporary = self.checkpoint + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump({"games": self.games, "bytes": self.out.tell()}, file)
+        os.replace(temporary, self.checkpoint)
+
+    def __report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.__lastReport < REPORT_EVERY:
+            return
+        self.__lastReport = now
+        seconds = now - self.__start
+        ready = sum(1 for *_, result in self.__pending if result.ready())
+        sys.stderr.write("{} games, {} positions, {:.1f} positions/s, {} searching, {} waiting\n".format(
+            self.games, self.positions, self.positions / seconds if seconds > 0 else 0.0,
+            len(self.__pending) - ready, ready))
+
+    def __drain(self, size: int) -> None:
+        """
+        Writes results in order until at most size are pending.
+        """
+        while len(self.__pending) > size:
+            game, ply, last, result = self.__pending.popleft()
+            self.__write(game, ply, last, result.get())
+            self.__report()
+
+    def run(self) -> None:
+        self.__start = self.__lastReport = time.perf_counter()
+        if not self.workers:
+            parallel.initWorker(0, {"maxDepth": self.depth})
+            for game, ply, last, task in self.__tasks():
+                self.__write(game, ply, last, analyse(task))
+                self.__report()
+            self.__report(True)
+            return
+        with multiprocessing.Pool(self.workers, parallel.initWorker, (0, {"maxDepth": self.depth})) as pool:
+            for game, ply, last, task in self.__tasks():
+                self.__pending.append((game, ply, last, pool.apply_async(analyse, (task,))))
+                self.__drain(self.window - 1)
+            self.__drain(0)
+        self.__report(True)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Annotate game archives with engine analysis.")
+    parser.add_argument("files", nargs="+", help="PDN files, or self-play .jsonl files")
+    parser.add_argument("--out", default="analysis.jsonl")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="search processes, 0 to search in process")
+    parser.add_argument("--depth", type=int, default=DEPTH)
+    parser.add_argument("--blunder", type=int, default=BLUNDER, help="score loss flagged as a blunder")
+    parser.add_argument("--window", type=int, default=None, help="positions in flight, 4 per worker by default")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint of --out")
+    args = parser.parse_args()
+
+    checkpoint = args.out + ".checkpoint"
+    skip = size = 0
+    if args.resume and os.path.exists(checkpoint):
+        with open(checkpoint) as file:
+            state = json.load(file)
+        skip, size = state["games"], state["bytes"]
+        if not os.path.exists(args.out) or os.path.getsize(args.out) < size:
+            sys.stderr.write("{} is shorter than its checkpoint, run again without --resume\n".format(args.out))
+            return 1
+    elif os.path.exists(checkpoint):
+        os.remove(checkpoint) # A fresh run: the checkpoint of an earlier one no longer applies
+    out = open(args.out, "r+" if size else "w")
+    out.truncate(size) # Drops annotations written after the checkpoint
+    out.seek(size)
+    analysis = Analysis(args.files, out, checkpoint, args.workers, args.depth, args.blunder, args.window, skip)
+    try:
+        analysis.run()
+    except KeyboardInterrupt:
+        sys.stderr.write("Interrupted after {} games, run again with --resume\n".format(analysis.games))
+        return 130
+    finally:
+        out.close()
+    return 1 if analysis.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
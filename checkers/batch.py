@@ -0,0 +1,203 @@
+"""
+Batched move generation with NumPy. Generates the legal moves of
+many positions at once with array operations: each step of every
+jump chain, slide or quiet move is computed for all positions
+together. Rules and move format are those of bitboard.Position.
+"""
+from typing import NamedTuple
+import numpy as np
+from .bitboard import COORDS, NEIGHBOUR, RAYS, SHIFTS, FORWARD, FULL, SQUARES
+from .constants import PLAYER_RED, PLAYER_WHITE
+
+# Square codes of an (N, 8, 8) board array
+EMPTY, RED_MAN, RED_KING, WHITE_MAN, WHITE_KING = 0, 1, 2, 3, 4
+
+# Tables ------------------------------------------------------------------
+# Square SQUARES is an off-board sentinel: its bit is never set, so it
+# reads as neither empty nor occupied and stops every ray and jump.
+OFF = SQUARES
+BITS = np.uint64(1) << np.arange(SQUARES + 1, dtype=np.uint64)
+BITS[OFF] = 0
+ROW_INDEX = np.array([row for row, _ in COORDS])
+COL_INDEX = np.array([col for _, col in COORDS])
+NEIGHBOURS = np.full((4, SQUARES + 1), OFF, dtype=np.int64)
+for d in range(4):
+    NEIGHBOURS[d, :SQUARES] = [square if square != -1 else OFF for square in NEIGHBOUR[d]]
+RAY_TABLE = np.full((SQUARES + 1, 4, 9), OFF, dtype=np.int64) # Padded past the longest ray
+for square in range(SQUARES):
+    for d in range(4):
+        RAY_TABLE[square, d, :len(RAYS[d][square])] = RAYS[d][square]
+FORWARD_DIRECTIONS = np.array([FORWARD[PLAYER_RED], FORWARD[PLAYER_WHITE]]) # By player
+
+class BatchMoves(NamedTuple):
+    """
+    Legal moves of a batch of positions as flat arrays, sorted by
+    position: index of the position, origin and target squares,
+    and bitboard of the captured pieces.
+    """
+    position: np.ndarray
+    origin: np.ndarray
+    target: np.ndarray
+    captured: np.ndarray
+
+# Packing -----------------------------------------------------------------
+def packBoards(boards: np.ndarray) -> tuple:
+    """
+    Packs an (N, 8, 8) array of square codes into
+    (white, red, kings) uint64 bitboard arrays.
+    """
+    values = np.asarray(boards)[:, ROW_INDEX, COL_INDEX]
+    def pack(mask: np.ndarray) -> np.ndarray:
+        return (mask.astype(np.uint64) << np.arange(SQUARES, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+    white = pack((values == WHITE_MAN) | (values == WHITE_KING))
+    red = pack((values == RED_MAN) | (values == RED_KING))
+    kings = pack((values == WHITE_KING) | (values == RED_KING))
+    return white, red, kings
+
+def packPositions(positions: list) -> tuple:
+    """
+    Packs bitboard Positions into (white, red, kings, turn) arrays.
+    """
+    return (
+        np.array([position.white for position in positions], dtype=np.uint64),
+        np.array([position.red for position in positions], dtype=np.uint64),
+        np.array([position.kings for position in positions], dtype=np.uint64),
+        np.array([position.turn for position in positions], dtype=np.int64),
+    )
+
+# Helpers -----------------------------------------------------------------
+def bitAt(bitboards: np.ndarray, squares: np.ndarray) -> np.ndarray:
+    """
+    Returns whether bitboards have the bit of squares set,
+    element-wise. The sentinel square is never set.
+    """
+    return (bitboards & BITS[squares]) != 0
+
+def expand(bitboards: np.ndarray) -> tuple:
+    """
+    Returns (index, square) arrays of every set bit.
+    """
+    return np.nonzero((bitboards[:, None] & BITS[None, :SQUARES]) != 0)
+
+def shiftMasked(bitboards: np.ndarray, delta: int, mask: int) -> np.ndarray:
+    """
+    Shifts the masked squares of bitboards by delta.
+    """
+    masked = bitboards & np.uint64(mask)
+    if delta > 0:
+        return masked << np.uint64(delta)
+    return masked >> np.uint64(-delta)
+
+# Generation --------------------------------------------------------------
+def quietMen(own, empty, kings, turn) -> tuple:
+    """
+    Returns the one-step moves of men as (position index,
+    origin square, target square) arrays, one entry per move.
+    """
+    men = own & ~kings
+    positions, origins, targets = [], [], []
+    for player in (PLAYER_RED, PLAYER_WHITE):
+        movers = np.where(turn == player, men, np.uint64(0))
+        for d in FORWARD[player]:
+            for delta, mask in SHIFTS[d]:
+                reached = shiftMasked(movers, delta, mask) & empty
+                index, square = expand(reached)
+                positions.append(index)
+                origins.append(square - delta)
+                targets.append(square)
+    return np.concatenate(positions), np.concatenate(origins), np.concatenate(targets)
+
+def quietKings(own, empty, kings) -> tuple:
+    """
+    Returns the flying moves of kings as (position index,
+    origin square, target square) arrays, one entry per move.
+    """
+    index, origin = expand(own & kings)
+    positions, origins, targets = [], [], []
+    for d in range(4):
+        ray = RAY_TABLE[origin, d] # (P, 9)
+        free = np.cumprod(bitAt(empty[index][:, None], ray), axis=1).astype(bool)
+        pair, step = np.nonzero(free)
+        positions.append(index[pair])
+        origins.append(origin[pair])
+        targets.append(ray[pair, step])
+    return np.concatenate(positions), np.concatenate(origins), np.concatenate(targets)
+
+def uniqueStates(index, origin, square, captured) -> tuple:
+    """
+    Drops duplicate chain states.
+    """
+    if len(index) == 0:
+        return index, origin, square, captured
+    keys = np.stack([index.astype(np.uint64), origin.astype(np.uint64), square.astype(np.uint64), captured], axis=1)
+    _, first = np.unique(keys, axis=0, return_index=True)
+    first.sort()
+    return index[first], origin[first], square[first], captured[first]
+
+def captures(own, opponent, empty, kings, turn) -> tuple:
+    """
+    Expands every jump chain of men and kings, one jump of all
+    chains per iteration. Every chain state reached is a move.
+    """
+    found = [[], [], [], []]
+    for king in (False, True):
+        index, origin = expand(own & (kings if king else ~kings))
+        square, captured = origin.copy(), np.zeros(len(index), dtype=np.uint64)
+        while len(index):
+            steps = [[], [], [], []]
+            directions = range(4) if king else range(2)
+            for d in directions:
+                if king:
+                    ray = RAY_TABLE[square, d]
+                    passable = bitAt(empty[index][:, None], ray) | bitAt(captured[:, None], ray)
+                    first = np.argmax(~passable, axis=1)
+                    row = np.arange(len(index))
+                    middle, landing = ray[row, first], ray[row, first + 1]
+                else:
+                    direction = FORWARD_DIRECTIONS[turn[index], d]
+                    middle = NEIGHBOURS[direction, square]
+                    landing = NEIGHBOURS[direction, middle]
+                valid = bitAt(opponent[index], middle) & bitAt(empty[index], landing)
+                for i, values in enumerate((index, origin, landing, captured | BITS[middle])):
+                    steps[i].append(values[valid])
+            index, origin, square, captured = uniqueStates(*(np.concatenate(step) for step in steps))
+            for i, values in enumerate((index, origin, square, captured)):
+                found[i].append(values)
+    return tuple(np.concatenate(values) for values in found)
+
+def legalMoves(white: np.ndarray, red: np.ndarray, kings: np.ndarray, turn: np.ndarray) -> BatchMoves:
+    """
+    Returns the legal moves of a batch of positions given as
+    bitboard and turn arrays. Captures are mandatory: positions
+    with a capture only get their captures.
+    """
+    white = np.asarray(white, dtype=np.uint64)
+    red = np.asarray(red, dtype=np.uint64)
+    kings = np.asarray(kings, dtype=np.uint64)
+    turn = np.asarray(turn, dtype=np.int64)
+    whiteToMove = turn == PLAYER_WHITE
+    own = np.where(whiteToMove, white, red)
+    opponent = np.where(whiteToMove, red, white)
+    empty = ~(white | red) & np.uint64(FULL)
+
+    capIndex, capOrigin, capTarget, capCaptured = captures(own, opponent, empty, kings, turn)
+    menIndex, menOrigin, menTarget = quietMen(own, empty, kings, turn)
+    kingIndex, kingOrigin, kingTarget = quietKings(own, empty, kings)
+
+    hasCapture = np.zeros(len(turn), dtype=bool)
+    hasCapture[capIndex] = True
+    quietIndex = np.concatenate([menIndex, kingIndex])
+    keep = ~hasCapture[quietIndex]
+    index = np.concatenate([capIndex, quietIndex[keep]])
+    origin = np.concatenate([capOrigin, np.concatenate([menOrigin, kingOrigin])[keep]])
+    target = np.concatenate([capTarget, np.concatenate([menTarget, kingTarget])[keep]])
+    captured = np.concatenate([capCaptured, np.zeros(int(keep.sum()), dtype=np.uint64)])
+    order = np.argsort(index, kind="stable")
+    return BatchMoves(index[order], origin[order].astype(np.int64), target[order].astype(np.int64), captured[order])
+
+def legalMovesOfBoards(boards: np.ndarray, turn: np.ndarray) -> BatchMoves:
+    """
+    Returns the legal moves of an (N, 8, 8) array of square codes.
+    """
+    white, red, kings = packBoards(boards)
+    return legalMoves(white, red, kings, turn)
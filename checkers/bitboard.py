@@ -0,0 +1,398 @@
+from .board import Board
+from .moves import Move
+from .zobrist import PIECE_KEYS, TURN_KEY, pieceKind
+from .evaluation import pieceSquareTables
+from .constants import ROWS, COLS, PIECES_ROWS, PLAYER_RED, PLAYER_WHITE
+
+# Squares -----------------------------------------------------------------
+# The 32 playable squares are numbered row by row, four per row:
+# square = row * 4 + col // 2. Bit n of a bitboard is square n.
+SQUARES = ROWS * COLS // 2
+FULL = (1 << SQUARES) - 1
+
+def squareToCoords(square: int) -> tuple:
+    """
+    Returns the (row, col) coordinates of a square index.
+    """
+    row = square // 4
+    return (row, 2 * (square % 4) + (row + 1) % 2)
+
+def coordsToSquare(coords: tuple) -> int:
+    """
+    Returns the square index of (row, col) coordinates.
+    """
+    row, col = coords
+    return row * 4 + col // 2
+
+COORDS = [squareToCoords(square) for square in range(SQUARES)]
+
+def squares(bitboard: int):
+    """
+    Yields the square index of every set bit.
+    """
+    while bitboard:
+        bit = bitboard & -bitboard
+        yield bit.bit_length() - 1
+        bitboard ^= bit
+
+def toMove(move: tuple) -> Move:
+    """
+    Converts an (origin, target, captured) bitboard move to a Move.
+    """
+    origin, target, captured = move
+    return Move(COORDS[origin], COORDS[target], tuple(COORDS[square] for square in squares(captured)))
+
+def fromMove(move: Move) -> tuple:
+    """
+    Converts a Move to an (origin, target, captured) bitboard move.
+    """
+    captured = 0
+    for coords in move.captures:
+        captured |= 1 << coordsToSquare(coords)
+    return (coordsToSquare(move.origin), coordsToSquare(move.target), captured)
+
+# Directions --------------------------------------------------------------
+DIRECTIONS = [ # Represents 4 diagonals, ordered unlike MoveTree so that 3 - d is the opposite of d
+    (1, 1), (1, -1),
+    (-1, 1), (-1, -1)
+]
+FORWARD = {PLAYER_WHITE: (0, 1), PLAYER_RED: (2, 3)}
+
+def __neighbour(square: int, direction: tuple) -> int:
+    """
+    Returns the next square along direction, -1 off the board.
+    """
+    row, col = COORDS[square]
+    rowDir, colDir = direction
+    row, col = row + rowDir, col + colDir
+    if 0 <= row < ROWS and 0 <= col < COLS:
+        return coordsToSquare((row, col))
+    return -1
+
+def __ray(square: int, d: int) -> tuple:
+    """
+    Returns every square along diagonal d, nearest first.
+    """
+    ray = []
+    square = NEIGHBOUR[d][square]
+    while square != -1:
+        ray.append(square)
+        square = NEIGHBOUR[d][square]
+    return tuple(ray)
+
+def __shifts(d: int) -> tuple:
+    """
+    Returns (delta, source mask) pairs for diagonal d. Moving a
+    whole bitboard one step along a diagonal shifts each masked
+    group of squares by delta; the delta depends on row parity.
+    """
+    masks = dict()
+    for square in range(SQUARES):
+        if NEIGHBOUR[d][square] != -1:
+            delta = NEIGHBOUR[d][square] - square
+            masks[delta] = masks.get(delta, 0) | (1 << square)
+    return tuple(sorted(masks.items()))
+
+NEIGHBOUR = [[__neighbour(square, direction) for square in range(SQUARES)] for direction in DIRECTIONS]
+RAYS = [[__ray(square, d) for square in range(SQUARES)] for d in range(len(DIRECTIONS))]
+SHIFTS = [__shifts(d) for d in range(len(DIRECTIONS))]
+
+# SQUARE_KEYS[kind][square]: Zobrist keys of checkers.zobrist by square index.
+SQUARE_KEYS = [[keys[row * COLS + col] for row, col in COORDS] for keys in PIECE_KEYS]
+# SQUARE_SCORES[kind][square]: piece-square scores of checkers.evaluation by square index.
+SQUARE_SCORES = [[scores[row * COLS + col] for row, col in COORDS] for scores in pieceSquareTables(COLS)]
+
+# PROMOTION[player]: squares on which a man becomes king.
+PROMOTION = {
+    PLAYER_WHITE: sum(1 << square for square in range(SQUARES - 4, SQUARES)),
+    PLAYER_RED: sum(1 << square for square in range(4)),
+}
+
+def shift(bitboard: int, d: int) -> int:
+    """
+    Moves every bit one step along diagonal d. Bits
+    leaving the board are dropped.
+    """
+    shifted = 0
+    for delta, mask in SHIFTS[d]:
+        if delta > 0:
+            shifted |= (bitboard & mask) << delta
+        else:
+            shifted |= (bitboard & mask) >> -delta
+    return shifted
+
+class Position:
+    """
+    Bitboard representation of a position: white men and kings,
+    red men and kings, kings of either colour, and the side to move.
+    Positions are immutable; play() returns a new one and updates
+    the Zobrist hash and the piece-square score incrementally. They
+    equal Board.positionKey() and Board.score.
+    Moves are (origin, target, captured) tuples of square indexes,
+    captured being a bitboard of the jumped pieces.
+    Rules are the MoveTree ones: men move and capture forward, kings
+    slide and capture along any diagonal, landing right behind the
+    captured piece, and a jump chain may stop on any landing square.
+    """
+
+    __slots__ = ("white", "red", "kings", "turn", "zobrist", "score")
+
+    def __init__(self, white: int, red: int, kings: int = 0, turn: int = PLAYER_RED,
+                 zobrist: int|None = None, score: int|None = None) -> None:
+        self.white: int = white
+        self.red: int = red
+        self.kings: int = kings
+        self.turn: int = turn
+        self.zobrist: int = zobrist if zobrist is not None else self.__computeZobrist()
+        self.score: int = score if score is not None else self.__computeScore() # From white's view
+
+    def __computeZobrist(self) -> int:
+        """
+        Computes the Zobrist hash from scratch.
+        """
+        zobrist = TURN_KEY if self.turn == PLAYER_WHITE else 0
+        for player, pieces in ((PLAYER_WHITE, self.white), (PLAYER_RED, self.red)):
+            for square in squares(pieces):
+                zobrist ^= SQUARE_KEYS[pieceKind(player, self.kings >> square & 1)][square]
+        return zobrist
+
+    def __computeScore(self) -> int:
+        """
+        Computes the piece-square score from scratch.
+        """
+        score = 0
+        for player, pieces in ((PLAYER_WHITE, self.white), (PLAYER_RED, self.red)):
+            for square in squares(pieces):
+                score += SQUARE_SCORES[pieceKind(player, self.kings >> square & 1)][square]
+        return score
+
+    def __repr__(self) -> str:
+        return "Position(white={:#010x}, red={:#010x}, kings={:#010x}, turn={})".format(
+            self.white, self.red, self.kings, self.turn
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Position) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def key(self) -> tuple:
+        """
+        Returns the position as a tuple of ints.
+        """
+        return (self.white, self.red, self.kings, self.turn)
+
+    # Setup -------------------------------------------------------------------
+    @classmethod
+    def initial(cls) -> "Position":
+        """
+        Returns the starting position of Board.
+        """
+        rowSquares = PIECES_ROWS * 4
+        white = (1 << rowSquares) - 1
+        red = ((1 << rowSquares) - 1) << (SQUARES - rowSquares)
+        return cls(white, red, 0, PLAYER_RED)
+
+    @classmethod
+    def fromBoard(cls, board: Board, turn: int = PLAYER_RED) -> "Position":
+        """
+        Returns the position held by a Board.
+        """
+        white = red = kings = 0
+        for piece in board.getPieces(PLAYER_WHITE):
+            white |= 1 << coordsToSquare(piece.getCoords())
+            kings |= piece.king << coordsToSquare(piece.getCoords())
+        for piece in board.getPieces(PLAYER_RED):
+            red |= 1 << coordsToSquare(piece.getCoords())
+            kings |= piece.king << coordsToSquare(piece.getCoords())
+        return cls(white, red, kings, turn)
+
+    def toBoard(self) -> Board:
+        """
+        Returns a Board holding the position.
+        """
+        rows = [["."] * COLS for _ in range(ROWS)]
+        for square, (row, col) in enumerate(COORDS):
+            char = "w" if self.white >> square & 1 else "r" if self.red >> square & 1 else "."
+            rows[row][col] = char.upper() if self.kings >> square & 1 else char
+        return Board.fromDiagram("\n".join("".join(row) for row in rows))
+
+    # Move generation ---------------------------------------------------------
+    def __sides(self, player: int) -> tuple:
+        if player == PLAYER_WHITE:
+            return self.white, self.red
+        return self.red, self.white
+
+    def __manCaptures(self, square: int, player: int, opponent: int, empty: int, captured: int, moves: list) -> None:
+        """
+        Appends every jump chain of a man starting at square.
+        """
+        for d in FORWARD[player]:
+            target = NEIGHBOUR[d][square]
+            if target == -1 or not opponent >> target & 1:
+                continue
+            landing = NEIGHBOUR[d][target]
+            if landing == -1 or not empty >> landing & 1:
+                continue
+            jumped = captured | (1 << target)
+            moves.append((landing, jumped))
+            self.__manCaptures(landing, player, opponent, empty, jumped, moves)
+
+    def __kingCaptures(self, square: int, opponent: int, empty: int, captured: int,
+                       moves: list, seen: set) -> None:
+        """
+        Appends every jump chain of a king starting at square.
+        Pieces already jumped are passed over, as in MoveTree.
+        """
+        for ray in (RAYS[0][square], RAYS[1][square], RAYS[2][square], RAYS[3][square]):
+            for i, target in enumerate(ray):
+                bit = 1 << target
+                if captured & bit or empty & bit:
+                    continue
+                if opponent & bit and i + 1 < len(ray) and empty >> ray[i + 1] & 1:
+                    landing = ray[i + 1]
+                    jumped = captured | bit
+                    if (landing, jumped) not in seen:
+                        seen.add((landing, jumped))
+                        moves.append((landing, jumped))
+                        self.__kingCaptures(landing, opponent, empty, jumped, moves, seen)
+                break
+
+    def __kingMoves(self, square: int, empty: int, moves: list) -> None:
+        """
+        Appends every quiet king move starting at square.
+        """
+        for d in range(4):
+            for target in RAYS[d][square]:
+                if not empty >> target & 1:
+                    break
+                moves.append((square, target, 0))
+
+    def __captures(self, square: int, player: int) -> list:
+        """
+        Returns (target, captured) pairs of every jump chain
+        of the piece on square.
+        """
+        _, opponent = self.__sides(player)
+        empty = FULL & ~(self.white | self.red)
+        chains = []
+        if self.kings >> square & 1:
+            self.__kingCaptures(square, opponent, empty, 0, chains, set())
+        else:
+            self.__manCaptures(square, player, opponent, empty, 0, chains)
+        return chains
+
+    def __jumpers(self, player: int) -> int:
+        """
+        Returns the men of player that have at least one capture.
+        Kings are not included.
+        """
+        own, opponent = self.__sides(player)
+        men = own & ~self.kings
+        empty = FULL & ~(self.white | self.red)
+        jumpers = 0
+        for d in FORWARD[player]:
+            back = 3 - d # Opposite diagonal
+            jumpers |= shift(shift(empty, back) & opponent, back)
+        return jumpers & men
+
+    def pieceMoves(self, square: int) -> list:
+        """
+        Returns the moves of the piece on square. As in MoveTree,
+        a piece that can capture has no quiet moves.
+        """
+        player = PLAYER_WHITE if self.white >> square & 1 else PLAYER_RED
+        chains = self.__captures(square, player)
+        if chains:
+            return [(square, target, captured) for target, captured in chains]
+        moves = []
+        empty = FULL & ~(self.white | self.red)
+        if self.kings >> square & 1:
+            self.__kingMoves(square, empty, moves)
+        else:
+            for d in FORWARD[player]:
+                target = NEIGHBOUR[d][square]
+                if target != -1 and empty >> target & 1:
+                    moves.append((square, target, 0))
+        return moves
+
+    def legalMoves(self) -> list:
+        """
+        Returns every legal move of the side to move. Captures
+        are mandatory: if any piece can capture, only captures
+        are returned.
+        """
+        player = self.turn
+        own, _ = self.__sides(player)
+        empty = FULL & ~(self.white | self.red)
+        moves = []
+        # Captures, from men able to jump and from kings
+        for square in squares(self.__jumpers(player) | (own & self.kings)):
+            for target, captured in self.__captures(square, player):
+                moves.append((square, target, captured))
+        if moves:
+            return moves
+        # Quiet men moves, one bulk shift per diagonal
+        men = own & ~self.kings
+        for d in FORWARD[player]:
+            for delta, mask in SHIFTS[d]:
+                if delta > 0:
+                    targets = ((men & mask) << delta) & empty
+                else:
+                    targets = ((men & mask) >> -delta) & empty
+                while targets:
+                    bit = targets & -targets
+                    target = bit.bit_length() - 1
+                    moves.append((target - delta, target, 0))
+                    targets ^= bit
+        # Quiet king moves
+        for square in squares(own & self.kings):
+            self.__kingMoves(square, empty, moves)
+        return moves
+
+    # Moving ------------------------------------------------------------------
+    def play(self, move: tuple) -> "Position":
+        """
+        Returns the position after move.
+        """
+        origin, target, captured = move
+        fromBit, toBit = 1 << origin, 1 << target
+        white, red, kings = self.white, self.red, self.kings
+        if self.turn == PLAYER_WHITE:
+            white = (white ^ fromBit) | toBit
+            red &= ~captured
+            turn = PLAYER_RED
+        else:
+            red = (red ^ fromBit) | toBit
+            white &= ~captured
+            turn = PLAYER_WHITE
+        kind = 2 * self.turn # Man of the side to move, see zobrist.pieceKind
+        zobrist = self.zobrist ^ TURN_KEY
+        score = self.score
+        for square in squares(captured):
+            capturedKind = 2 * turn + (kings >> square & 1)
+            zobrist ^= SQUARE_KEYS[capturedKind][square]
+            score -= SQUARE_SCORES[capturedKind][square]
+        kings &= ~captured
+        if kings & fromBit:
+            kings = (kings ^ fromBit) | toBit
+            zobrist ^= SQUARE_KEYS[kind + 1][origin] ^ SQUARE_KEYS[kind + 1][target]
+            score += SQUARE_SCORES[kind + 1][target] - SQUARE_SCORES[kind + 1][origin]
+        elif toBit & PROMOTION[self.turn]:
+            kings |= toBit
+            zobrist ^= SQUARE_KEYS[kind][origin] ^ SQUARE_KEYS[kind + 1][target]
+            score += SQUARE_SCORES[kind + 1][target] - SQUARE_SCORES[kind][origin]
+        else:
+            zobrist ^= SQUARE_KEYS[kind][origin] ^ SQUARE_KEYS[kind][target]
+            score += SQUARE_SCORES[kind][target] - SQUARE_SCORES[kind][origin]
+        return Position(white, red, kings, turn, zobrist, score)
+
+    def perft(self, depth: int) -> int:
+        """
+        Counts the leaf nodes of the move tree to depth.
+        """
+        moves = self.legalMoves()
+        if depth <= 1:
+            return len(moves) if depth == 1 else 1
+        return sum(self.play(move).perft(depth - 1) for move in moves)
@@ -1,54 +1,146 @@
-import pygame
-from pygame.surface import Surface
-from .constants import COLS, ROWS, PIECES_ROWS, RED, GREEN, BEIGE, WHITE, SQUARE_SIZE, PLAYER_RED, PLAYER_WHITE
+from typing import NamedTuple
+from .constants import PLAYER_RED, PLAYER_WHITE
 from .piece import Piece
+from .moves import MoveTree, MoveCache, Move
+from .rules import Rules, CHECKERS
+from .zobrist import pieceKeys, pieceKind, turnKey
+from .evaluation import pieceSquareTables
+
+class Undo(NamedTuple):
+    """
+    Undo record of a move made with Board.makeMove: the move,
+    the captured pieces, whether the move promoted the piece
+    and the player who made it.
+    """
+    move: Move
+    captured: tuple
+    promoted: bool
+    turn: int|None
 
 class Board:
+    """
+    Square grid of pieces, played by the rules of a Rules
+    variant (checkers on 8x8 by default).
+    """
 
-    def __init__(self) -> None:
-        self.board = [[None for _ in range(COLS)]for _ in range(ROWS)]
+    def __init__(self, rules: Rules = CHECKERS) -> None:
+        self.rules: Rules = rules
+        self.size: int = rules.size
+        self.board = [[None for _ in range(self.size)]for _ in range(self.size)]
+        self.__pieceKeys: list = pieceKeys(self.size)
+        self.__pieceScores: list = pieceSquareTables(self.size)
+        self.hash: int = 0 # Zobrist hash of the pieces, see checkers.zobrist
+        self.score: int = 0 # Evaluation of the pieces from white's view, see checkers.evaluation
+        self.pieces: dict = {PLAYER_RED: dict(), PLAYER_WHITE: dict()} # Player -> pieces, as ordered sets
+        self.kingCounts: dict = {PLAYER_RED: 0, PLAYER_WHITE: 0}
+        self.history: list[Undo] = [] # Undo stack of makeMove
+        self.moveCache: MoveCache|None = None # Optional cache of legalMoves() piece moves
 
         self.__initialiseBoard()
 
-    # GUI ---------------------------------------------------------------------
-    def __drawBoard(self, win: Surface) -> None:
+    # Board setup -------------------------------------------------------------
+    def __initialiseBoard(self) -> None:
         """
-        Draws checkers board.
+        Initialise the board with both players pieces.
+        Empty squares hold None.
         """
-        win.fill(WHITE)
-        for row in range(ROWS):
-            for col in range(row % 2, ROWS, 2):
-                pygame.draw.rect(win, GREEN, (row * SQUARE_SIZE, col * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-    
-    def __drawPieces(self, win: Surface) -> None:
+        for row in range(self.rules.piecesRows):
+            for col in range((row + 1) % 2, self.size, 2):
+                self.board[row][col] = Piece(player=PLAYER_WHITE, row=row, col=col)
+        for row in range(self.size - self.rules.piecesRows, self.size):
+            for col in range((row + 1) % 2, self.size, 2):
+                self.board[row][col] = Piece(player=PLAYER_RED, row=row, col=col)
+        self.__buildIndex()
+
+    def __buildIndex(self) -> None:
         """
-        Draws pieces on the board.
+        Computes the Zobrist hash, score, piece index
+        and king counts from scratch.
         """
-        for row in range(ROWS):
-            for col in range(COLS):
-                if type(self.board[row][col]) == Piece:
-                    self.board[row][col].drawPiece(win)
+        self.hash = 0
+        self.score = 0
+        self.pieces = {PLAYER_RED: dict(), PLAYER_WHITE: dict()}
+        self.kingCounts = {PLAYER_RED: 0, PLAYER_WHITE: 0}
+        for row in self.board:
+            for squareContent in row:
+                if squareContent is not None:
+                    self.__index(squareContent)
 
-    def renderBoard(self, win: Surface) -> None:
+    def __pieceKey(self, player: int, king: bool, coords: tuple) -> int:
         """
-        Draws board and pieces.
+        Returns the Zobrist key of a piece standing on coords.
         """
-        self.__drawBoard(win)
-        self.__drawPieces(win)
+        row, col = coords
+        return self.__pieceKeys[pieceKind(player, king)][row * self.size + col]
 
-    # Board setup -------------------------------------------------------------
-    def __initialiseBoard(self) -> None:
+    def __pieceScore(self, player: int, king: bool, coords: tuple) -> int:
         """
-        Initialise the board with both players pieces.
-        Empty squares hold None.
+        Returns the piece-square score of a piece standing on coords.
+        """
+        row, col = coords
+        return self.__pieceScores[pieceKind(player, king)][row * self.size + col]
+
+    def __index(self, piece: Piece) -> None:
+        """
+        Adds a piece standing on the board to the
+        piece index, king counts, hash and score.
+        """
+        self.pieces[piece.getOwner()][piece] = None
+        self.kingCounts[piece.getOwner()] += piece.king
+        self.hash ^= self.__pieceKey(piece.getOwner(), piece.king, piece.getCoords())
+        self.score += self.__pieceScore(piece.getOwner(), piece.king, piece.getCoords())
+
+    def __unindex(self, piece: Piece) -> None:
+        """
+        Removes a piece from the piece index,
+        king counts, hash and score.
+        """
+        del self.pieces[piece.getOwner()][piece]
+        self.kingCounts[piece.getOwner()] -= piece.king
+        self.hash ^= self.__pieceKey(piece.getOwner(), piece.king, piece.getCoords())
+        self.score -= self.__pieceScore(piece.getOwner(), piece.king, piece.getCoords())
+
+    @classmethod
+    def fromDiagram(cls, diagram: str, rules: Rules = CHECKERS) -> "Board":
+        """
+        Builds a board from a text diagram, one line per row
+        starting at row 0: '.' empty, 'w'/'r' white/red man,
+        'W'/'R' white/red king.
+        """
+        board = cls(rules)
+        board.board = [[None for _ in range(board.size)] for _ in range(board.size)]
+        lines = [line.strip() for line in diagram.strip().splitlines()]
+        for row, line in enumerate(lines):
+            for col, char in enumerate(line):
+                if char in "wW":
+                    piece = Piece(player=PLAYER_WHITE, row=row, col=col)
+                elif char in "rR":
+                    piece = Piece(player=PLAYER_RED, row=row, col=col)
+                else:
+                    continue
+                if (row + col) % 2 == 0:
+                    raise ValueError("Piece on a light square: {}".format((row, col)))
+                piece.king = char.isupper()
+                board.board[row][col] = piece
+        board.__buildIndex()
+        return board
+
+    def toDiagram(self) -> str:
         """
-        for row in range(PIECES_ROWS):
-            for col in range((row + 1) % 2, COLS, 2):
-                self.board[row][col] = Piece(color=BEIGE, player=PLAYER_WHITE, row=row, col=col)
-        for row in range(COLS - PIECES_ROWS, ROWS):
-            for col in range((row + 1) % 2, COLS, 2):
-                self.board[row][col] = Piece(color=RED, player=PLAYER_RED, row=row, col=col)
-                
+        Returns the board as a text diagram, see fromDiagram.
+        """
+        lines = []
+        for row in self.board:
+            line = ""
+            for squareContent in row:
+                if squareContent is None:
+                    line += "."
+                else:
+                    char = "w" if squareContent.getOwner() == PLAYER_WHITE else "r"
+                    line += char.upper() if squareContent.king else char
+            lines.append(line)
+        return "\n".join(lines)
+
     # Events ------------------------------------------------------------------
     def getSquareContent(self, coords) -> Piece|None:
         """
@@ -65,25 +157,120 @@ class Board:
         rowTo, colTo = coords
         self.board[pieceRow][pieceCol], self.board[rowTo][colTo] = \
             self.board[rowTo][colTo], self.board[pieceRow][pieceCol]
-        piece.move(coords)
+        self.hash ^= self.__pieceKey(piece.getOwner(), piece.king, (pieceRow, pieceCol))
+        self.score -= self.__pieceScore(piece.getOwner(), piece.king, (pieceRow, pieceCol))
+        wasKing = piece.king
+        piece.move(coords, self.size - 1) # May promote the piece
+        self.kingCounts[piece.getOwner()] += piece.king and not wasKing
+        self.hash ^= self.__pieceKey(piece.getOwner(), piece.king, coords)
+        self.score += self.__pieceScore(piece.getOwner(), piece.king, coords)
     
     def delete(self, coords: tuple) -> None:
         """
         Deletes piece fron the board.
         """
         row, col = coords
+        squareContent = self.board[row][col]
+        if squareContent is not None:
+            self.__unindex(squareContent)
         self.board[row][col] = None
 
+    def makeMove(self, move: Move, player=None) -> Undo:
+        """
+        Plays a move: deletes the captured pieces and moves the
+        piece. Pushes and returns an undo record, so that the
+        move can be taken back with unmakeMove.
+        """
+        piece = self.getSquareContent(move.origin)
+        captured = tuple(self.getSquareContent(coords) for coords in move.captures)
+        for coords in move.captures:
+            self.delete(coords)
+        wasKing = piece.king
+        self.move(piece, move.target)
+        undo = Undo(move, captured, piece.king and not wasKing, player)
+        self.history.append(undo)
+        return undo
+
+    def unmakeMove(self) -> Undo:
+        """
+        Takes back the last move played with makeMove, restoring
+        captured pieces and demoting a piece it promoted.
+        Returns its undo record.
+        """
+        undo = self.history.pop()
+        move = undo.move
+        rowFrom, colFrom = move.origin
+        rowTo, colTo = move.target
+        piece = self.board[rowTo][colTo]
+        self.hash ^= self.__pieceKey(piece.getOwner(), piece.king, move.target)
+        self.score -= self.__pieceScore(piece.getOwner(), piece.king, move.target)
+        self.board[rowTo][colTo], self.board[rowFrom][colFrom] = None, piece # Origin last: a chain may end on it
+        piece.undoMove(move.origin, undo.promoted)
+        self.kingCounts[piece.getOwner()] -= undo.promoted
+        self.hash ^= self.__pieceKey(piece.getOwner(), piece.king, move.origin)
+        self.score += self.__pieceScore(piece.getOwner(), piece.king, move.origin)
+        for squareContent in undo.captured:
+            row, col = squareContent.getCoords()
+            self.board[row][col] = squareContent
+            self.__index(squareContent)
+        return undo
+
+    def positionKey(self, player) -> int:
+        """
+        Returns the Zobrist hash of the position with
+        the specified player to move.
+        """
+        return self.hash ^ turnKey(player)
+
+    def evaluate(self, player) -> int:
+        """
+        Returns the piece-square evaluation of the position
+        from the specified player's view, in O(1).
+        """
+        return self.score if player == PLAYER_WHITE else -self.score
+
     def countPieces(self, owner) -> int:
         """
         Returns the number of pieces, owned by the
         specified owner, left on the board.
         """
-        count = 0
-        for row in range(ROWS):
-            for col in range(COLS):
-                squareContent = self.getSquareContent((row, col))
-                if type(squareContent) == Piece:
-                    if squareContent.getOwner() == owner:
-                        count += 1
-        return count
+        return len(self.pieces[owner])
+
+    def countKings(self, owner) -> int:
+        """
+        Returns the number of kings, owned by the
+        specified owner, left on the board.
+        """
+        return self.kingCounts[owner]
+
+    def getPieces(self, owner) -> list[Piece]:
+        """
+        Returns the pieces, owned by the specified
+        owner, left on the board.
+        """
+        return list(self.pieces[owner])
+
+    def legalMoves(self, player) -> list[Move]:
+        """
+        Returns every legal move of the specified player in a
+        single pass over its pieces. Captures are mandatory: if
+        any piece can capture, only captures are returned.
+        Piece moves go through moveCache when one is set.
+        Under majorityCapture, only the captures taking the
+        most pieces are returned.
+        """
+        captures, moves = [], []
+        for piece in self.pieces[player]:
+            if self.moveCache is not None:
+                pieceMoves = self.moveCache.pieceMoves(piece, self, player)
+            else:
+                pieceMoves = MoveTree(piece, self).moveList()
+            for move in pieceMoves:
+                if move.captures:
+                    captures.append(move)
+                elif not captures:
+                    moves.append(move)
+        if captures and self.rules.majorityCapture:
+            most = max(len(move.captures) for move in captures)
+            return [move for move in captures if len(move.captures) == most]
+        return captures if captures else moves
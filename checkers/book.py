@@ -0,0 +1,188 @@
+"""
+Opening book. A sorted file of (position key, move, weight) records
+built from game records, looked up by binary search over an mmap of
+the file, so the book is never loaded into memory.
+
+Usage: python -m checkers.book build [--plies N] [--out FILE] games.jsonl ...
+       python -m checkers.book show [--book FILE]
+"""
+import sys
+import json
+import mmap
+import random
+import struct
+import argparse
+from .bitboard import Position
+from .search import Search
+from .constants import PLAYER_RED, PLAYER_WHITE
+
+MAGIC = b"BOOK"
+HEADER = struct.Struct("<4sI") # Magic, record count
+RECORD = struct.Struct("<QQI") # Zobrist key, packed move, weight
+BOOK_PLIES = 20 # Plies of each game entered in the book
+BOOK_PATH = "book.bin"
+
+# Weight a move gets from each game it was played in
+RESULT_WEIGHTS = {"win": 2, "draw": 1, "loss": 0}
+
+def packMove(move: tuple) -> int:
+    """
+    Packs an (origin, target, captured) bitboard move in an int.
+    """
+    origin, target, captured = move
+    return origin | target << 6 | captured << 12
+
+def unpackMove(packed: int) -> tuple:
+    """
+    Returns the (origin, target, captured) move packMove packed.
+    """
+    return (packed & 0x3f, packed >> 6 & 0x3f, packed >> 12)
+
+# Building ----------------------------------------------------------------
+def readSelfPlay(path: str):
+    """
+    Yields (moves, winner) from a self-play JSONL file, winner
+    being "red", "white" or "draw".
+    """
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                yield [tuple(move) for move in record["moves"]], record["winner"]
+
+def build(games, out: str, plies: int = BOOK_PLIES) -> int:
+    """
+    Writes the book of the first plies of games, an iterable of
+    (moves, winner), to out. Moves are weighted by the results of
+    the games they were played in; moves that only lost are left out.
+    Returns the number of records.
+    """
+    weights = dict()
+    names = {PLAYER_RED: "red", PLAYER_WHITE: "white"}
+    for moves, winner in games:
+        position = Position.initial()
+        for move in moves[:plies]:
+            if move not in position.legalMoves():
+                break # Not a game of these rules
+            result = "draw" if winner == "draw" else ("win" if winner == names[position.turn] else "loss")
+            entry = (position.zobrist, packMove(move))
+            weights[entry] = weights.get(entry, 0) + RESULT_WEIGHTS[result]
+            position = position.play(move)
+    records = sorted((key, move, weight) for (key, move), weight in weights.items() if weight > 0)
+    with open(out, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(records)))
+        for key, move, weight in records:
+            file.write(RECORD.pack(key, move, min(weight, 0xffffffff)))
+    return len(records)
+
+class OpeningBook:
+    """
+    Read access to a book file. Lookups binary search the mapped
+    records, reading only the pages they touch.
+    """
+
+    def __init__(self, path: str = BOOK_PATH) -> None:
+        self.path: str = path
+        with open(path, "rb") as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC or len(self.__map) != HEADER.size + self.size * RECORD.size:
+            self.__map.close()
+            raise ValueError("{} is not an opening book".format(path))
+
+    def close(self) -> None:
+        self.__map.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __key(self, i: int) -> int:
+        return struct.unpack_from("<Q", self.__map, HEADER.size + i * RECORD.size)[0]
+
+    def __lowerBound(self, key: int) -> int:
+        """
+        Returns the first record index whose key is not below key.
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.__key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, position: Position) -> list:
+        """
+        Returns the (move, weight) book entries of position. Moves
+        not legal in position, from key collisions, are dropped.
+        """
+        legal = position.legalMoves()
+        entries = []
+        i = self.__lowerBound(position.zobrist)
+        while i < self.size:
+            key, packed, weight = RECORD.unpack_from(self.__map, HEADER.size + i * RECORD.size)
+            if key != position.zobrist:
+                break
+            move = unpackMove(packed)
+            if move in legal:
+                entries.append((move, weight))
+            i += 1
+        return entries
+
+    def pick(self, position: Position, rng: random.Random) -> tuple|None:
+        """
+        Returns a book move picked at random in proportion
+        to its weight, or None if position is out of book.
+        """
+        entries = self.lookup(position)
+        if not entries:
+            return None
+        moves, weights = zip(*entries)
+        return rng.choices(moves, weights)[0]
+
+class BookPlayer:
+    """
+    Picks moves from an opening book while in book, and
+    from a search once out of it.
+    """
+
+    def __init__(self, book: OpeningBook|None, search: Search, rng: random.Random|None = None) -> None:
+        self.book: OpeningBook|None = book
+        self.search: Search = search
+        self.rng: random.Random = rng or random.Random()
+
+    def chooseMove(self, position: Position) -> tuple|None:
+        """
+        Returns the move to play in position, None if there is none.
+        """
+        if self.book is not None:
+            move = self.book.pick(position, self.rng)
+            if move is not None:
+                return move
+        return self.search.search(position).bestMove
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Opening book.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    builder = commands.add_parser("build", help="build a book from self-play JSONL files")
+    builder.add_argument("games", nargs="+")
+    builder.add_argument("--plies", type=int, default=BOOK_PLIES)
+    builder.add_argument("--out", default=BOOK_PATH)
+    shower = commands.add_parser("show", help="list the book moves of the starting position")
+    shower.add_argument("--book", default=BOOK_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        games = (game for path in args.games for game in readSelfPlay(path))
+        print("{} records written to {}".format(build(games, args.out, args.plies), args.out))
+        return 0
+    book = OpeningBook(args.book)
+    print("{} records".format(len(book)))
+    for move, weight in sorted(book.lookup(Position.initial()), key=lambda entry: -entry[1]):
+        print("{:<16} {:>8}".format(str(move), weight))
+    book.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
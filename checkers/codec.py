@@ -0,0 +1,52 @@
+"""
+Packed position codec. A position fits in three 32-bit masks (white
+pieces, red pieces, kings) and the side to move: 13 bytes as a
+record, or a single int key.
+"""
+import struct
+from .board import Board
+from .bitboard import Position, FULL
+
+POSITION = struct.Struct("<IIIB") # White, red, kings, side to move
+TURN_SHIFT = 96
+
+def encode(position: Position) -> bytes:
+    """
+    Packs position into a POSITION.size bytes record.
+    """
+    return POSITION.pack(position.white, position.red, position.kings, position.turn)
+
+def decode(data: bytes, offset: int = 0) -> Position:
+    """
+    Unpacks a position record, read from data at offset.
+    """
+    white, red, kings, turn = POSITION.unpack_from(data, offset)
+    if white & red or kings & ~(white | red) or turn > 1:
+        raise ValueError("Invalid position record: {}".format(bytes(data[offset:offset + POSITION.size]).hex()))
+    return Position(white, red, kings, turn)
+
+def packKey(position: Position) -> int:
+    """
+    Packs position into an int: white, red and kings masks
+    in bits 0-95, side to move in bit 96.
+    """
+    return position.white | position.red << 32 | position.kings << 64 | position.turn << TURN_SHIFT
+
+def unpackKey(key: int) -> Position:
+    """
+    Returns the Position packKey packed.
+    """
+    return Position(key & FULL, key >> 32 & FULL, key >> 64 & FULL, key >> TURN_SHIFT)
+
+def encodeBoard(board: Board, turn: int) -> bytes:
+    """
+    Packs a Board and the player to move.
+    """
+    return encode(Position.fromBoard(board, turn))
+
+def decodeBoard(data: bytes, offset: int = 0) -> tuple:
+    """
+    Unpacks a record into (Board, player to move).
+    """
+    position = decode(data, offset)
+    return position.toBoard(), position.turn
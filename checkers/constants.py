@@ -1,5 +1,3 @@
-import pygame
-
 # GAME
 ROWS, COLS = 8, 8
 PIECES_ROWS = 3 # How many rows of pieces each player has when the game begins
@@ -20,7 +18,4 @@ BLUE = (0, 0, 255)
 GREY = (128, 128, 128)
 
 # PICS
-CROWN = pygame.transform.scale(
-    pygame.image.load('pics/crown.png'),
-    (SQUARE_SIZE, SQUARE_SIZE)
-)
+CROWN_PATH = 'pics/crown.png'
@@ -0,0 +1,61 @@
+"""
+Piece-square evaluation. Every piece kind on every square is worth a
+fixed score, from white's view: material, man advancement, king
+value, back rank guard and centre control. A position's score is the
+sum of the scores of its pieces, so Board keeps it up to date with an
+addition and a subtraction per piece moved, captured or promoted, the
+way it keeps its Zobrist hash, and a leaf is evaluated in O(1).
+"""
+from .zobrist import KINDS
+from .constants import PLAYER_WHITE
+
+# Scores are in hundredths of a man.
+MAN_VALUE = 100
+KING_VALUE = 250
+ADVANCE_VALUE = 4 # Per row a man has advanced
+BACK_RANK_VALUE = 12 # Man still guarding its own back row
+CENTRE_VALUE = 6 # Piece on the central squares
+
+__tables: dict = dict() # Board size -> piece-square tables
+
+def pieceValue(player: int, king: bool, coords: tuple, size: int) -> int:
+    """
+    Returns the score of a piece on coords of a size x size
+    board, positive for white.
+    """
+    row, col = coords
+    advanced = row if player == PLAYER_WHITE else size - 1 - row # Rows from its own back row
+    margin = size // 4
+    score = CENTRE_VALUE if margin <= row < size - margin and margin <= col < size - margin else 0
+    if king:
+        score += KING_VALUE
+    else:
+        score += MAN_VALUE + ADVANCE_VALUE * advanced
+        score += BACK_RANK_VALUE if advanced == 0 else 0
+    return score if player == PLAYER_WHITE else -score
+
+def pieceSquareTables(size: int) -> list:
+    """
+    Returns the piece scores of a size x size board, indexed
+    as zobrist.PIECE_KEYS by kind and row * size + col.
+    """
+    if size not in __tables:
+        __tables[size] = [
+            [pieceValue(kind // 2, bool(kind % 2), (square // size, square % size), size)
+             for square in range(size * size)]
+            for kind in range(KINDS)
+        ]
+    return __tables[size]
+
+def evaluateBoard(board, player: int) -> int:
+    """
+    Evaluates a Board from scratch, scanning every square,
+    from player's view. Board.evaluate() gives the same
+    score from its incremental sum.
+    """
+    score = 0
+    for row, squares in enumerate(board.board):
+        for col, piece in enumerate(squares):
+            if piece is not None:
+                score += pieceValue(piece.getOwner(), piece.king, (row, col), board.size)
+    return score if player == PLAYER_WHITE else -score
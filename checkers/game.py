@@ -1,105 +1,56 @@
-import pygame
-from pygame.surface import Surface
-from pygame.font import Font
 from .board import Board
 from .piece import Piece
-from .moves import MoveTree
-from .constants import PLAYER_WHITE, PLAYER_RED, SQUARE_SIZE, GREY, BLUE, BLACK, WHITE, HEIGHT, WIDTH
+from .moves import Move, MoveCache
+from .rules import Rules, CHECKERS
+from .constants import PLAYER_WHITE, PLAYER_RED
 
 class Game():
     """
     Internal representation of the game. Holds the board,
     game state (turns, remaining pieces, etc.). Runs turns
     checks, compute moves, checks for stoppage ...
+    Rendering lives in checkers.gui, so a Game can be
+    driven headless.
     """
 
-    MOVE_GUIDE_RADIUS = SQUARE_SIZE // 2 * .20
-    CAPTURE_GUIDE_RADIUS = SQUARE_SIZE // 2 * .40
-    END_GAME_MENU_HEIGHT = 400
-    END_GAME_MENU_WIDTH = 250
-    FONT = pygame.font.SysFont("tlwgtypo", 30)
-
-    def __init__(self, win: Surface) -> None:
-        self.board: Board = Board()
+    def __init__(self, rules: Rules = CHECKERS) -> None:
+        self.board: Board = Board(rules)
         self.redPiecesCount: int = 0
         self.whitePiecesCount: int = 0
-        self.win: Surface = win
         self.turn = PLAYER_RED
         self.selectedPiece: Piece|None = None
         self.validMoves: dict = None
         self.startGame: bool = False
         self.endGame: bool = False
+        self.__turnMoves: list[Move]|None = None
+        self.moveCache: MoveCache|None = None # See enableMoveCache
 
         self.__updatePieceCounts()
 
-    # GUI ---------------------------------------------------------------------
-    def __drawText(self, text: str, font: Font, color: tuple, coords: tuple) -> None:
-        """
-        Draws text to window.
-        """
-        textImg = font.render(text, True, color)
-        self.win.blit(textImg, coords)
-    
-    def __drawEndGameMenu(self) -> None:
-        """
-        Draws endgame menu.
-        """
-        coords = (
-            (HEIGHT - self.END_GAME_MENU_HEIGHT) // 2,
-            (WIDTH - self.END_GAME_MENU_WIDTH) // 2,
-            self.END_GAME_MENU_HEIGHT,
-            self.END_GAME_MENU_WIDTH
-        )
-        # Draws menu box
-        pygame.draw.rect(self.win, BLACK, tuple(x + 5 for x in coords)) # Menu shade
-        pygame.draw.rect(self.win, GREY, coords)
-        # Add message
-        message = "The {} player won!".format("red" if self.turn == PLAYER_RED else "white")
-        textImg = self.FONT.render(message, True, WHITE)
-        coords = (
-            (HEIGHT - textImg.get_width()) // 2,
-            (WIDTH - textImg.get_height()) // 2 - (self.END_GAME_MENU_WIDTH // 3),
-            self.END_GAME_MENU_HEIGHT,
-            self.END_GAME_MENU_WIDTH
-        )
-        self.win.blit(textImg, coords)
+    @classmethod
+    def fromBoard(cls, board: Board, turn: int) -> "Game":
+        """
+        Returns a game continuing from board with turn to move.
+        """
+        game = cls(board.rules)
+        game.board = board
+        game.turn = turn
+        game.__updatePieceCounts()
+        if game.redPiecesCount == 0 or game.whitePiecesCount == 0 or not game.legalMoves():
+            game.turn = 1 - turn # Side to move has lost
+            game.__endGame()
+        return game
 
-    def __drawMoveGuides(self, coords: tuple) -> None:
+    def enableMoveCache(self, size: int = 4096) -> MoveCache:
         """
-        Draws pieces move guides.
+        Makes the board go through a MoveCache. legalMoves() is
+        already computed once per turn, so the cache only pays
+        off when positions come back, as after a take-back.
         """
-        row, col = coords
-        position = (
-            row * SQUARE_SIZE + SQUARE_SIZE // 2,
-            col * SQUARE_SIZE + SQUARE_SIZE // 2
-        )
-        pygame.draw.circle(self.win, GREY, position, self.MOVE_GUIDE_RADIUS)
-    
-    def __drawCaptureGuides(self, coords: tuple) -> None:
-        """
-        Draw capture guides.
-        """
-        row, col = coords
-        position = (
-            row * SQUARE_SIZE + SQUARE_SIZE // 2,
-            col * SQUARE_SIZE + SQUARE_SIZE // 2
-        )
-        pygame.draw.circle(self.win, BLUE, position, self.CAPTURE_GUIDE_RADIUS)
-
-    def updateGui(self) -> None:
-        """
-        Updates the GUI.
-        """
-        self.board.renderBoard(self.win)
-        if self.validMoves:
-            for move in self.validMoves.keys():
-                self.__drawMoveGuides(move)
-                if self.validMoves[move]:
-                    for piece in self.validMoves[move]:
-                        coords = piece.getCoords()
-                        self.__drawCaptureGuides(coords)
-        if self.endGame:
-            self.__drawEndGameMenu()
+        if self.moveCache is None:
+            self.moveCache = MoveCache(size)
+            self.board.moveCache = self.moveCache
+        return self.moveCache
 
     # EVENTS ------------------------------------------------------------------
     def runGame(self, coords: tuple) -> None:
@@ -115,6 +66,26 @@ class Game():
         else:
             self.__select(coords)
 
+    def legalMoves(self) -> list[Move]:
+        """
+        Returns the legal moves of the player to move.
+        Computed once per turn.
+        """
+        if self.__turnMoves is None:
+            self.__turnMoves = self.board.legalMoves(self.turn)
+        return self.__turnMoves
+
+    def __pieceMoves(self, piece: Piece) -> dict:
+        """
+        Returns the legal moves of a piece as a dictionary.
+        Format: coords -> captured pieces
+        """
+        moves = dict()
+        for move in self.legalMoves():
+            if move.origin == piece.getCoords() and move.target not in moves:
+                moves[move.target] = [self.board.getSquareContent(c) for c in move.captures]
+        return moves
+
     def __updatePieceCounts(self) -> None:
         """
         Updates piece counts for both players.
@@ -132,19 +103,14 @@ class Game():
         if self.selectedPiece:
             move = self.__move(coords)
             if not move:
-                self.selectedPiece.updateSelectedStatus()
                 self.selectedPiece = None
                 self.__select(coords)
         else:
-            if self.selectedPiece:
-                self.selectedPiece.updateSelectedStatus()
             squareContent = self.board.getSquareContent(coords)
             if squareContent is not None:
                 if squareContent.getOwner() == self.turn:
                     self.selectedPiece = squareContent
-                    self.selectedPiece.updateSelectedStatus()
-                    tree = MoveTree(self.selectedPiece, self.board)
-                    self.validMoves = tree.validMoves()
+                    self.validMoves = self.__pieceMoves(self.selectedPiece)
                     return True
             else:
                 self.validMoves = None
@@ -160,25 +126,53 @@ class Game():
                 return True
         return False
     
-    def __capture(self, coords: tuple) -> None:
-        """
-        Deletes captured pieces.
-        """
-        for piece in self.validMoves[coords]:
-            self.board.delete(piece.getCoords())
-
     def __move(self, coords: tuple) -> bool:
         """
         Moves the selected piece to coordinates.
         Returns true upon success, false otherwise.
         """
         if self.selectedPiece is not None and self.__isInValidMove(coords):
-            self.__capture(coords)
-            self.board.move(self.selectedPiece, coords)
-            self.selectedPiece.updateSelectedStatus()
+            captures = tuple(piece.getCoords() for piece in self.validMoves[coords])
+            self.board.makeMove(Move(self.selectedPiece.getCoords(), coords, captures), self.turn)
             self.__nextTurn()
             return True
         return False
+
+    def playMove(self, move: Move) -> bool:
+        """
+        Plays a move of the player to move, without going
+        through piece selection (engines, headless games).
+        Returns true upon success, false if move is not legal.
+        Captures may be listed in any order.
+        """
+        if self.endGame:
+            return False
+        captures = set(move.captures)
+        for legal in self.legalMoves():
+            if legal.origin == move.origin and legal.target == move.target and set(legal.captures) == captures:
+                break
+        else:
+            return False
+        self.board.makeMove(legal, self.turn)
+        self.__nextTurn()
+        return True
+
+    def unmakeMove(self) -> bool:
+        """
+        Takes back the last move played, and gives the
+        turn back to the player who made it.
+        Returns true upon success, false if no move was played.
+        """
+        if not self.board.history:
+            return False
+        undo = self.board.unmakeMove()
+        self.selectedPiece = None
+        self.validMoves = None
+        self.__turnMoves = None
+        self.endGame = False
+        self.turn = undo.turn
+        self.__updatePieceCounts()
+        return True
     
     def __nextTurn(self) -> None:
         """
@@ -186,13 +180,19 @@ class Game():
         """
         self.selectedPiece = None
         self.validMoves = None
+        self.__turnMoves = None
         self.__updatePieceCounts()
         if self.redPiecesCount == 0 or self.whitePiecesCount == 0:
             self.__endGame()
-        elif self.turn == PLAYER_RED:
+            return
+        winner = self.turn
+        if self.turn == PLAYER_RED:
             self.turn = PLAYER_WHITE
         else:
             self.turn = PLAYER_RED
+        if not self.legalMoves(): # Blocked player loses
+            self.turn = winner
+            self.__endGame()
     
     def __endGame(self) -> None:
         """
@@ -0,0 +1,254 @@
+import json
+import pygame
+from collections import deque
+from pygame.surface import Surface
+from pygame.font import Font
+from .game import Game
+from .piece import Piece
+from .constants import ROWS, SQUARE_SIZE, GREEN, WHITE, GREY, BLUE, BLACK, RED, BEIGE, HEIGHT, WIDTH, CROWN_PATH, PLAYER_RED, PLAYER_WHITE
+
+# PICS
+CROWN = pygame.transform.scale(
+    pygame.image.load(CROWN_PATH),
+    (SQUARE_SIZE, SQUARE_SIZE)
+)
+
+class FrameStats:
+    """
+    Main loop timings, in seconds, for each frame: event handling,
+    engine move, GameView.updateGui and display update. Keeps the
+    last SAMPLES frames, plus the time spent waiting for events.
+    """
+
+    PHASES = ("events", "engine", "update", "display")
+    SAMPLES = 10000
+
+    def __init__(self) -> None:
+        self.frames: int = 0
+        self.redrawn: int = 0 # Frames that updated the display
+        self.idle: float = 0.0 # Time spent waiting for events
+        self.__samples: deque = deque(maxlen=self.SAMPLES)
+
+    def __repr__(self) -> str:
+        return "FrameStats({})".format(self.asDict())
+
+    def addFrame(self, idle: float, timings: tuple, redrawn: bool) -> None:
+        """
+        Records a frame: idle time, then one timing per phase.
+        """
+        self.frames += 1
+        self.redrawn += redrawn
+        self.idle += idle
+        self.__samples.append(timings)
+
+    def asDict(self) -> dict:
+        """
+        Returns the counters and, for each phase, the mean, median,
+        99th percentile and worst frame time in milliseconds.
+        """
+        phases = dict()
+        for i, phase in enumerate(self.PHASES + ("total",)):
+            if phase == "total":
+                times = sorted(sum(timings) for timings in self.__samples)
+            else:
+                times = sorted(timings[i] for timings in self.__samples)
+            if times:
+                phases[phase] = {
+                    "mean": 1000 * sum(times) / len(times),
+                    "p50": 1000 * times[len(times) // 2],
+                    "p99": 1000 * times[min(len(times) - 1, int(len(times) * 0.99))],
+                    "max": 1000 * times[-1],
+                }
+        return {"frames": self.frames, "redrawn": self.redrawn, "idleSeconds": self.idle, "ms": phases}
+
+    def dump(self, stream) -> None:
+        """
+        Writes the counters to stream as a JSON line.
+        """
+        stream.write(json.dumps(self.asDict()) + "\n")
+
+class GameView():
+    """
+    Pygame front end of a Game. Only this module imports
+    pygame, so the rules can be used without a display.
+    """
+
+    PIECES_RADIUS = SQUARE_SIZE // 2 * .68
+    PADDING_RADIUS = SQUARE_SIZE // 2 * .75
+    MOVE_GUIDE_RADIUS = SQUARE_SIZE // 2 * .20
+    CAPTURE_GUIDE_RADIUS = SQUARE_SIZE // 2 * .40
+    END_GAME_MENU_HEIGHT = 400
+    END_GAME_MENU_WIDTH = 250
+    FONT = pygame.font.SysFont("tlwgtypo", 30)
+    PIECE_COLORS = {PLAYER_WHITE: BEIGE, PLAYER_RED: RED}
+
+    def __init__(self, game: Game, win: Surface) -> None:
+        self.game: Game = game
+        self.win: Surface = win
+        self.background: Surface = self.__renderBackground()
+        self.__drawn: dict = dict() # Coords -> square state on screen
+        self.__drawnEndGame: bool|None = None # None forces a full redraw
+
+    # Board -------------------------------------------------------------------
+    def __renderBackground(self) -> Surface:
+        """
+        Renders the empty checkers board once.
+        """
+        background = Surface((WIDTH, HEIGHT))
+        background.fill(WHITE)
+        for row in range(ROWS):
+            for col in range(row % 2, ROWS, 2):
+                pygame.draw.rect(background, GREEN, self.__squareRect((row, col)))
+        return background
+
+    def __squareRect(self, coords: tuple) -> pygame.Rect:
+        """
+        Returns the window area of a square.
+        """
+        row, col = coords
+        return pygame.Rect(row * SQUARE_SIZE, col * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+
+    def __squareCenter(self, coords: tuple) -> tuple:
+        """
+        Returns the window position of the center of a square.
+        """
+        row, col = coords
+        return (row * SQUARE_SIZE + SQUARE_SIZE // 2, col * SQUARE_SIZE + SQUARE_SIZE // 2)
+
+    def __drawPiece(self, piece: Piece) -> None:
+        """
+        Draws piece to GUI.
+        """
+        position = self.__squareCenter(piece.getCoords())
+        if piece is self.game.selectedPiece:
+            pygame.draw.circle(self.win, BLACK, position, self.PADDING_RADIUS)
+        else:
+            pygame.draw.circle(self.win, GREY, position, self.PADDING_RADIUS)
+        pygame.draw.circle(self.win, self.PIECE_COLORS[piece.getOwner()], position, self.PIECES_RADIUS)
+        if piece.king:
+            x, y = position
+            self.win.blit(CROWN,
+                (x - CROWN.get_width()//2, y - CROWN.get_height()//2)
+            )
+
+    def __squareStates(self) -> dict:
+        """
+        Returns what each non-empty square should show:
+        coords -> (piece, piece look, move guide, capture guide).
+        """
+        states = dict()
+        board = self.game.board
+        for player in board.pieces:
+            for piece in board.pieces[player]:
+                states[piece.getCoords()] = [piece, (piece.getOwner(), piece.king, piece is self.game.selectedPiece), False, False]
+        validMoves = self.game.validMoves
+        if validMoves:
+            for move, captures in validMoves.items():
+                states.setdefault(move, [None, None, False, False])[2] = True
+                for piece in captures:
+                    states[piece.getCoords()][3] = True
+        return states
+
+    def __drawSquare(self, coords: tuple, state: list|None) -> pygame.Rect:
+        """
+        Redraws a single square from the cached background.
+        Returns the updated area.
+        """
+        rect = self.__squareRect(coords)
+        self.win.blit(self.background, rect, rect)
+        if state is not None:
+            piece, _, moveGuide, captureGuide = state
+            if piece is not None:
+                self.__drawPiece(piece)
+            if moveGuide:
+                self.__drawMoveGuides(coords)
+            if captureGuide:
+                self.__drawCaptureGuides(coords)
+        return rect
+
+    def renderBoard(self) -> list:
+        """
+        Draws the squares whose content changed since the last
+        call, or the whole board after invalidate().
+        Returns the updated areas.
+        """
+        states = self.__squareStates()
+        full = self.__drawnEndGame is None
+        if full:
+            self.win.blit(self.background, (0, 0))
+            self.__drawn = dict()
+        rects = []
+        for coords in self.__drawn.keys() | states.keys():
+            state = states.get(coords)
+            drawn = self.__drawn.get(coords)
+            if state is None or drawn is None or state[1:] != drawn[1:]:
+                rects.append(self.__drawSquare(coords, state))
+        self.__drawn = states
+        return [self.win.get_rect()] if full else rects
+
+    def invalidate(self) -> None:
+        """
+        Forces a full redraw on the next updateGui call,
+        e.g. after the window was uncovered.
+        """
+        self.__drawnEndGame = None
+
+    # Game --------------------------------------------------------------------
+    def __drawText(self, text: str, font: Font, color: tuple, coords: tuple) -> None:
+        """
+        Draws text to window.
+        """
+        textImg = font.render(text, True, color)
+        self.win.blit(textImg, coords)
+
+    def __drawEndGameMenu(self) -> pygame.Rect:
+        """
+        Draws endgame menu. Returns its area.
+        """
+        coords = (
+            (HEIGHT - self.END_GAME_MENU_HEIGHT) // 2,
+            (WIDTH - self.END_GAME_MENU_WIDTH) // 2,
+            self.END_GAME_MENU_HEIGHT,
+            self.END_GAME_MENU_WIDTH
+        )
+        # Draws menu box
+        pygame.draw.rect(self.win, BLACK, tuple(x + 5 for x in coords)) # Menu shade
+        pygame.draw.rect(self.win, GREY, coords)
+        area = pygame.Rect(coords[0], coords[1], coords[2] + 10, coords[3] + 10)
+        # Add message
+        message = "The {} player won!".format("red" if self.game.turn == PLAYER_RED else "white")
+        textImg = self.FONT.render(message, True, WHITE)
+        coords = (
+            (HEIGHT - textImg.get_width()) // 2,
+            (WIDTH - textImg.get_height()) // 2 - (self.END_GAME_MENU_WIDTH // 3),
+            self.END_GAME_MENU_HEIGHT,
+            self.END_GAME_MENU_WIDTH
+        )
+        self.win.blit(textImg, coords)
+        return area
+
+    def __drawMoveGuides(self, coords: tuple) -> None:
+        """
+        Draws pieces move guides.
+        """
+        pygame.draw.circle(self.win, GREY, self.__squareCenter(coords), self.MOVE_GUIDE_RADIUS)
+
+    def __drawCaptureGuides(self, coords: tuple) -> None:
+        """
+        Draw capture guides.
+        """
+        pygame.draw.circle(self.win, BLUE, self.__squareCenter(coords), self.CAPTURE_GUIDE_RADIUS)
+
+    def updateGui(self) -> list:
+        """
+        Updates the GUI. Only squares touched by a move, a
+        selection or a guide change are redrawn. Returns the
+        updated areas, for pygame.display.update.
+        """
+        if self.__drawnEndGame and not self.game.endGame:
+            self.invalidate() # Menu closed, e.g. a move was taken back
+        rects = self.renderBoard()
+        if self.game.endGame and (rects or not self.__drawnEndGame):
+            rects.append(self.__drawEndGameMenu()) # Keep the menu above redrawn squares
+        self.__drawnEndGame = self.game.endGame
+        return rects
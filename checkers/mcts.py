@@ -0,0 +1,326 @@
+"""
+Monte Carlo tree search (UCT) over bitboard positions, which play by
+the MoveTree rules. Tree nodes live in parallel arrays indexed by node
+number instead of one object each, the children of a node stored
+next to each other: a node costs its move, parent, first child, child
+count, visits and value, 28 bytes. Positions are not stored but
+replayed from the root along the path being searched.
+
+Playouts run in batches: a batch of leaves is selected, each path
+taking a virtual loss so that the leaves differ, the leaves are
+played out together, in process or across a pool of workers, and
+their results are backed up. The subtree under the moves played
+since the previous search is kept.
+"""
+import math
+import time
+import random
+import multiprocessing
+from array import array
+from .bitboard import Position
+from .search import SearchResult, evaluate, WIN_SCORE
+from .evaluation import MAN_VALUE
+
+EXPLORATION = 1.4 # UCT exploration constant
+BATCH = 32 # Leaves played out together
+PLAYOUT_PLIES = 80 # Playouts still running after this many plies are scored by evaluate()
+MAX_NODES = 1000000
+UNEXPANDED = -1
+
+# Playouts ----------------------------------------------------------------
+def playout(key: tuple, seed: int) -> float:
+    """
+    Plays random moves from position key until the game ends or for
+    PLAYOUT_PLIES. Returns the result for the side to move at key:
+    1 win, 0 loss, in between from the evaluation of the last position.
+    """
+    position = Position(*key)
+    rng = random.Random(seed)
+    for _ in range(PLAYOUT_PLIES):
+        moves = position.legalMoves()
+        if not moves:
+            return 0.0 if position.turn == key[3] else 1.0
+        position = position.play(rng.choice(moves))
+    score = evaluate(position) if position.turn == key[3] else -evaluate(position)
+    return 0.5 + 0.5 * math.tanh(score / (2 * MAN_VALUE))
+
+def playoutTask(task: tuple) -> float:
+    """
+    Pool task: playout() of a (position key, seed) task.
+    """
+    return playout(*task)
+
+def toScore(result: float) -> int:
+    """
+    Turns a mean playout result back into an evaluation score.
+    """
+    result = min(max(result, 0.001), 0.999)
+    return round(2 * MAN_VALUE * math.atanh(2 * result - 1))
+
+# Tree --------------------------------------------------------------------
+class Tree:
+    """
+    Search tree as parallel arrays. Node 0 is the root; a node's
+    value sums the results of its playouts for the player who
+    moved into it.
+    """
+
+    __slots__ = ("origin", "target", "captured", "parent", "firstChild", "childCount", "visits", "value")
+
+    def __init__(self) -> None:
+        self.origin = array("B") # Move leading to the node
+        self.target = array("B")
+        self.captured = array("I")
+        self.parent = array("i")
+        self.firstChild = array("i") # UNEXPANDED until the children are added
+        self.childCount = array("H")
+        self.visits = array("I")
+        self.value = array("d")
+        self.add(-1, (0, 0, 0))
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def add(self, parent: int, move: tuple, visits: int = 0, value: float = 0.0) -> int:
+        """
+        Appends a node and returns its index.
+        """
+        origin, target, captured = move
+        self.origin.append(origin)
+        self.target.append(target)
+        self.captured.append(captured)
+        self.parent.append(parent)
+        self.firstChild.append(UNEXPANDED)
+        self.childCount.append(0)
+        self.visits.append(visits)
+        self.value.append(value)
+        return len(self.parent) - 1
+
+    def expand(self, node: int, moves: list) -> None:
+        """
+        Adds the children of a node, one per move.
+        """
+        self.firstChild[node] = len(self)
+        self.childCount[node] = len(moves)
+        for move in moves:
+            self.add(node, move)
+
+    def move(self, node: int) -> tuple:
+        return (self.origin[node], self.target[node], self.captured[node])
+
+    def children(self, node: int) -> range:
+        first = self.firstChild[node]
+        return range(first, first + self.childCount[node]) if first != UNEXPANDED else range(0)
+
+    def subtree(self, node: int) -> "Tree":
+        """
+        Returns a copy of the subtree under node, node as its root.
+        """
+        tree = Tree()
+        tree.visits[0], tree.value[0] = self.visits[node], self.value[node]
+        queue = [(node, 0)]
+        for old, new in queue: # Breadth first, keeping siblings together
+            if self.firstChild[old] != UNEXPANDED:
+                tree.firstChild[new] = len(tree)
+                tree.childCount[new] = self.childCount[old]
+                for child in self.children(old):
+                    queue.append((child, tree.add(new, self.move(child), self.visits[child], self.value[child])))
+        return tree
+
+    def memoryBytes(self) -> int:
+        """
+        Returns the size of the node arrays.
+        """
+        return sum(column.itemsize * len(column) for column in (getattr(self, name) for name in self.__slots__))
+
+class Mcts:
+    """
+    UCT search. Stops after maxPlayouts playouts or maxTime seconds,
+    whichever comes first, and plays the most visited root move. The
+    tree grows to maxNodes nodes at most, the root being expanded
+    whatever the cap; past it leaves are played out without being
+    expanded. With workers, playouts run across a process pool: use
+    as a context manager, or call close(). search() returns a
+    SearchResult, nodes counting playouts.
+    """
+
+    def __init__(self, maxPlayouts: int|None = 10000, maxTime: float|None = None, maxNodes: int = MAX_NODES,
+                 batch: int = BATCH, workers: int = 0, seed: int|None = None) -> None:
+        self.maxPlayouts: int|None = maxPlayouts
+        self.maxTime: float|None = maxTime
+        self.maxNodes: int = maxNodes
+        self.batch: int = batch
+        self.playouts: int = 0 # Playouts of the last search
+        self.seconds: float = 0.0
+        self.reused: int = 0 # Nodes kept from the previous search
+        self.tree: Tree = Tree()
+        self.rng: random.Random = random.Random(seed)
+        self.__root: Position|None = None
+        self.__pool = multiprocessing.Pool(workers) if workers else None
+
+    def __enter__(self) -> "Mcts":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+    def playoutsPerSecond(self) -> float:
+        return self.playouts / self.seconds if self.seconds > 0 else 0.0
+
+    def memoryBytes(self) -> int:
+        return self.tree.memoryBytes()
+
+    # Tree reuse --------------------------------------------------------------
+    def __find(self, position: Position) -> int|None:
+        """
+        Returns the node of position if it is the root, a child
+        or a grandchild of the root; None otherwise.
+        """
+        if self.__root is None:
+            return None
+        if self.__root == position:
+            return 0
+        tree = self.tree
+        for child in tree.children(0):
+            reply = self.__root.play(tree.move(child))
+            if reply == position:
+                return child
+            for grandchild in tree.children(child):
+                if reply.play(tree.move(grandchild)) == position:
+                    return grandchild
+        return None
+
+    def __reroot(self, position: Position) -> None:
+        """
+        Makes position the root, keeping its subtree if it was
+        reached within two plies of the previous root.
+        """
+        found = self.__find(position)
+        if found is None:
+            self.tree = Tree()
+            self.reused = 0
+        else:
+            if found:
+                self.tree = self.tree.subtree(found)
+            self.reused = len(self.tree)
+        self.__root = position
+
+    # Search ------------------------------------------------------------------
+    def __select(self, node: int) -> int:
+        """
+        Returns the child of node with the best UCT bound,
+        the first unvisited one if any.
+        """
+        tree = self.tree
+        logVisits = math.log(tree.visits[node])
+        best, bestBound = -1, -1.0
+        for child in tree.children(node):
+            visits = tree.visits[child]
+            if not visits:
+                return child
+            bound = tree.value[child] / visits + EXPLORATION * math.sqrt(logVisits / visits)
+            if bound > bestBound:
+                best, bestBound = child, bound
+        return best
+
+    def __descend(self) -> tuple:
+        """
+        Selects a leaf, expanding it if the node cap allows, and
+        counts a visit on its path (the virtual loss). Returns
+        (path, leaf position, leaf has no moves).
+        """
+        tree = self.tree
+        node, position = 0, self.__root
+        path = [0]
+        tree.visits[0] += 1
+        while tree.childCount[node]:
+            node = self.__select(node)
+            position = position.play(tree.move(node))
+            tree.visits[node] += 1
+            path.append(node)
+        if tree.firstChild[node] == UNEXPANDED:
+            moves = position.legalMoves()
+            if not moves:
+                tree.firstChild[node] = len(tree) # Expanded, no children: game over
+                return path, position, True
+            if len(tree) + len(moves) <= self.maxNodes or not node: # The root always has children
+                tree.expand(node, moves)
+                node = tree.firstChild[node] + self.rng.randrange(len(moves))
+                position = position.play(tree.move(node))
+                tree.visits[node] += 1
+                path.append(node)
+        elif not tree.childCount[node]:
+            return path, position, True
+        return path, position, False
+
+    def __backup(self, path: list, result: float) -> None:
+        """
+        Adds the result of a playout, for the side to move at
+        the leaf, to the nodes of its path.
+        """
+        value = self.tree.value
+        for node in reversed(path):
+            result = 1.0 - result # Node values are for the player who moved into the node
+            value[node] += result
+
+    def __runBatch(self, size: int) -> None:
+        leaves = [self.__descend() for _ in range(size)]
+        tasks = [(position.key(), self.rng.getrandbits(32)) for _, position, over in leaves if not over]
+        if self.__pool is not None:
+            results = iter(self.__pool.map(playoutTask, tasks))
+        else:
+            results = iter([playout(*task) for task in tasks])
+        for path, _, over in leaves:
+            self.__backup(path, 0.0 if over else next(results))
+        self.playouts += size
+
+    def __mostVisited(self, node: int) -> int|None:
+        """
+        Returns the most visited child of node, None if it has none.
+        """
+        tree = self.tree
+        return max(tree.children(node), key=lambda child: tree.visits[child], default=None)
+
+    def __principalVariation(self) -> list:
+        """
+        Returns the moves of the most visited path.
+        """
+        tree, node, pv = self.tree, 0, []
+        while True:
+            node = self.__mostVisited(node)
+            if node is None or not tree.visits[node]:
+                break
+            pv.append(tree.move(node))
+        return pv
+
+    def search(self, position: Position) -> SearchResult:
+        """
+        Searches position and returns a SearchResult.
+        """
+        start = time.perf_counter()
+        deadline = start + self.maxTime if self.maxTime is not None else None
+        self.playouts = 0
+        self.__reroot(position)
+        moves = position.legalMoves()
+        if not moves:
+            return SearchResult(None, -WIN_SCORE, 0, [], 0, 0.0)
+        if len(moves) == 1:
+            return SearchResult(moves[0], evaluate(position), 1, [moves[0]], 0, time.perf_counter() - start)
+        while self.maxPlayouts is None or self.playouts < self.maxPlayouts:
+            size = self.batch if self.maxPlayouts is None else min(self.batch, self.maxPlayouts - self.playouts)
+            self.__runBatch(size)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        self.seconds = time.perf_counter() - start
+        best = self.__mostVisited(0)
+        if best is None or not self.tree.visits[best]: # No playout reached a root move
+            return SearchResult(moves[0], evaluate(position), 1, [moves[0]], self.playouts, self.seconds)
+        score = toScore(self.tree.value[best] / self.tree.visits[best])
+        pv = self.__principalVariation()
+        return SearchResult(pv[0], score, len(pv), pv, self.playouts, self.seconds)
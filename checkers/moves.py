@@ -1,6 +1,133 @@
+import json
+import time
+from collections import OrderedDict
+from typing import NamedTuple, TYPE_CHECKING
 from .piece import Piece
-from .board import Board
-from .constants import ROWS, COLS, PLAYER_WHITE
+from .rules import Rules, DIRECTIONS, tablesOf
+from .constants import PLAYER_WHITE
+
+if TYPE_CHECKING:
+    from .board import Board
+
+class Move(NamedTuple):
+    """
+    Compact move: origin and target coordinates, and the
+    coordinates of the captured pieces in jump order.
+    """
+    origin: tuple
+    target: tuple
+    captures: tuple = ()
+
+    def isCapture(self) -> bool:
+        """
+        Returns true if the move captures, false otherwise.
+        """
+        return bool(self.captures)
+
+class MoveStats:
+    """
+    Move generation counters, collected while MoveTree.stats
+    holds an instance. Disabled by default.
+    """
+
+    def __init__(self) -> None:
+        self.calls: int = 0 # validMoves/moveList calls
+        self.nodes: int = 0 # Tree nodes expanded, one per distinct jump chain state
+        self.captures: int = 0 # Captures found
+        self.maxDepth: int = 0 # Deepest recursion of the tree building
+        self.seconds: float = 0.0 # Time spent in all calls
+        self.lastSeconds: float = 0.0 # Time spent in the last call
+
+    def __repr__(self) -> str:
+        return "MoveStats({})".format(self.asDict())
+
+    def asDict(self) -> dict:
+        """
+        Returns the counters as a dictionary.
+        """
+        return {
+            "calls": self.calls,
+            "nodes": self.nodes,
+            "captures": self.captures,
+            "maxDepth": self.maxDepth,
+            "seconds": self.seconds,
+            "lastSeconds": self.lastSeconds,
+            "secondsPerCall": self.seconds / self.calls if self.calls else 0.0,
+        }
+
+    def dump(self, stream) -> None:
+        """
+        Writes the counters to stream as a JSON line.
+        """
+        stream.write(json.dumps(self.asDict()) + "\n")
+
+class MoveCache:
+    """
+    Bounded LRU cache of MoveTree.moveList() results, keyed by
+    (Zobrist position key with the side to move, square).
+    Board.move, delete and promotions all update the board hash,
+    so a changed position never reads a stale entry; old entries
+    just age out of the cache.
+    """
+
+    def __init__(self, size: int = 4096) -> None:
+        self.size: int = size
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.__entries: OrderedDict = OrderedDict()
+
+    def __repr__(self) -> str:
+        return "MoveCache({})".format(self.asDict())
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets its counters.
+        """
+        self.__entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def pieceMoves(self, piece: Piece, board: "Board", player: int) -> tuple:
+        """
+        Returns the moves of piece, as MoveTree(piece, board).moveList(),
+        with player to move.
+        """
+        key = (board.positionKey(player), piece.getCoords())
+        moves = self.__entries.get(key)
+        if moves is not None:
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return moves
+        self.misses += 1
+        moves = tuple(MoveTree(piece, board).moveList())
+        self.__entries[key] = moves
+        if len(self.__entries) > self.size:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+        return moves
+
+    def asDict(self) -> dict:
+        """
+        Returns the counters as a dictionary.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "entries": len(self.__entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def dump(self, stream) -> None:
+        """
+        Writes the counters to stream as a JSON line.
+        """
+        stream.write(json.dumps(self.asDict()) + "\n")
 
 class MoveNode:
     """
@@ -52,21 +179,33 @@ class MoveNode:
 class MoveTree():
     """
     Main class for move tree computation.
-    Hold moving rules and jumping algorithm.
+    Hold moving rules and jumping algorithm, following
+    the Rules variant of the board.
+    Set MoveTree.stats to a MoveStats to collect counters.
     """
 
-    def __init__(self, piece: Piece, board: Board):
+    stats: MoveStats|None = None
+
+    def __init__(self, piece: Piece, board: "Board"):
         self.root = MoveNode(
             coords = piece.getCoords(),
             lastJumped = None
         )
         self.board = board
         self.piece = piece
+        self.rules: Rules = board.rules
+        self.grid: list = board.board
+        self.rays: list = tablesOf(board.size).rays
         if self.piece.getOwner() == PLAYER_WHITE:
             self.direction = 1
         else:
             self.direction = -1
+        self.manSteps: tuple = ((self.direction, 1), (self.direction, -1))
+        self.manJumps: tuple = self.manSteps
+        if self.rules.menCaptureBackwards:
+            self.manJumps += ((-self.direction, 1), (-self.direction, -1))
         self.moves: dict = dict()
+        self.__expanded: dict|None = None # Jump chain state -> node that expanded it
 
     def printTree(self, node: MoveNode) -> None:
         """
@@ -76,39 +215,78 @@ class MoveTree():
         for child in node.getChildren().values():
             self.printTree(child)
 
+    @classmethod
+    def enableStats(cls) -> MoveStats:
+        """
+        Starts collecting counters in a new MoveStats.
+        """
+        cls.stats = MoveStats()
+        return cls.stats
+
+    @classmethod
+    def disableStats(cls) -> MoveStats|None:
+        """
+        Stops collecting counters. Returns the last MoveStats.
+        """
+        stats, cls.stats = cls.stats, None
+        return stats
+
+    def __countCall(self, start: float) -> None:
+        """
+        Adds a validMoves/moveList call to the stats.
+        """
+        elapsed = time.perf_counter() - start
+        self.stats.calls += 1
+        self.stats.seconds += elapsed
+        self.stats.lastSeconds = elapsed
+
     # Tree --------------------------------------------------------------------
-    def __buildTree(self, node: MoveNode, jumped: list, hasCaptured: bool = False):
+    def __buildTree(self, node: MoveNode, jumped: tuple, hasCaptured: bool = False, depth: int = 0):
         """
-        Builds move tree for a given piece.
+        Builds move tree for a given piece. Each jump chain state
+        (landing square, captured pieces) is expanded exactly once;
+        reaching it again in another order adds a node sharing the
+        children of the first one, so every path runs to a real end.
         """
-        print("Jumped: {}".format(jumped))
+        stats = self.stats
         if not self.piece.king: # Man case
-            captures = self.__manCapture(node.getCoords())
-            if captures:
-                for capture in captures:
-                    move, target = capture
-                    node.children[move] = MoveNode(move, lastJumped = target)
-                    for child in node.getChildren().values():
-                        self.__buildTree(child, hasCaptured = True, jumped = jumped)
-            elif hasCaptured == False:
-                moves = self.__manMove(node.getCoords())
-                for move in moves:
-                    node.children[move] = MoveNode(move, lastJumped = None)
+            captures = self.__manCapture(node.getCoords(), jumped)
         else: # King case
             captures = self.__kingCapture(node.getCoords(), jumped)
-            if captures:
-                print("Captures: {}".format(captures))
-                for capture in captures:
-                    move, target = capture
-                    node.children[move] = MoveNode(move, lastJumped = target)
-                    jumped.append(target.getCoords())
-                    for child in node.getChildren().values():
-                        self.__buildTree(child, hasCaptured = True, jumped = jumped)
-            elif hasCaptured == False:
+        if stats is not None:
+            stats.maxDepth = max(stats.maxDepth, depth)
+        if captures:
+            for capture in captures:
+                move, target = capture
+                captured = jumped + (target.getCoords(),)
+                state = (move, frozenset(captured))
+                child = MoveNode(move, lastJumped = target)
+                node.children[move] = child
+                if state in self.__expanded: # Same continuations: share the built subtree
+                    child.children = self.__expanded[state].children
+                    continue
+                self.__expanded[state] = child
+                if stats is not None:
+                    stats.nodes += 1
+                    stats.captures += 1
+                self.__buildTree(child, captured, hasCaptured = True, depth = depth + 1)
+        elif hasCaptured == False:
+            if not self.piece.king:
+                moves = self.__manMove(node.getCoords())
+            else:
                 moves = self.__kingMove(node.getCoords())
-                for move in moves:
-                    node.children[move] = MoveNode(move, lastJumped = None)
+            if stats is not None:
+                stats.nodes += len(moves)
+            for move in moves:
+                node.children[move] = MoveNode(move, lastJumped = None)
 
+    def __build(self) -> None:
+        """
+        Builds the tree once, from the root.
+        """
+        if self.__expanded is None:
+            self.__expanded = dict()
+            self.__buildTree(self.root, ())
 
     def __getValidMoves(self, node: MoveNode, jumped: list) -> None:
         """
@@ -119,7 +297,6 @@ class MoveTree():
         skiped = jumped.copy()
         if node.hasLastJumped():
             skiped.append(node.getLastJumped())
-            print(jumped)
         self.moves[node.coords] = skiped
         if node.hasChildren():
             for node in node.getChildren().values():
@@ -130,114 +307,149 @@ class MoveTree():
         Explore the move tree and returns a move dictionary.
         Format: coords -> captures
         """
-        self.__buildTree(self.root, [])
+        start = time.perf_counter() if self.stats is not None else 0.0
+        self.__build()
+        self.moves = dict()
         self.__getValidMoves(self.root, [])
         self.moves.pop(self.root.getCoords())
+        if self.stats is not None:
+            self.__countCall(start)
         return self.moves
 
+    def __getMoveList(self, node: MoveNode, jumped: tuple, moves: dict) -> None:
+        """
+        Collects a Move for every node below node. Unlike
+        __getValidMoves, moves sharing a landing square
+        with different captures are all kept.
+        """
+        for child in node.getChildren().values():
+            captures = jumped
+            if child.hasLastJumped():
+                captures = jumped + (child.getLastJumped().getCoords(),)
+            key = (child.getCoords(), frozenset(captures))
+            if key not in moves: # A state seen before has had its shared subtree collected
+                moves[key] = Move(self.root.getCoords(), child.getCoords(), captures)
+                self.__getMoveList(child, captures, moves)
+
+    def moveList(self) -> list:
+        """
+        Explore the move tree and returns a list of Move,
+        one per landing square and captured set.
+        """
+        start = time.perf_counter() if self.stats is not None else 0.0
+        self.__build()
+        moves = dict()
+        self.__getMoveList(self.root, (), moves)
+        if self.stats is not None:
+            self.__countCall(start)
+        return list(moves.values())
+
+    def __getSequences(self, node: MoveNode, steps: list, sequences: list) -> None:
+        """
+        Collects the path from the root to every leaf below
+        node, as (landing coordinates, captured coordinates) steps.
+        """
+        for child in node.getChildren().values():
+            step = (child.getCoords(), child.getLastJumped().getCoords() if child.hasLastJumped() else None)
+            if child.hasChildren():
+                self.__getSequences(child, steps + [step], sequences)
+            else:
+                sequences.append(steps + [step])
+
+    def sequences(self) -> list:
+        """
+        Explore the move tree and returns every complete move
+        sequence: for a capture, the full jump chain, as a
+        list of (landing coordinates, captured coordinates).
+        """
+        self.__build()
+        sequences = []
+        self.__getSequences(self.root, [], sequences)
+        return sequences
+
     # Moving rules ------------------------------------------------------------
-    def __withinBounds(self, coords) -> bool:
+    def __isFree(self, coords: tuple) -> bool:
         """
-        Checks if coordinates are within bounds.
+        Checks if a square is empty. Under strictChains the
+        moving piece has left its starting square.
         """
         row, col = coords
-        if (row >= 0 and row < ROWS) and (col >= 0 and col < COLS):
-            return True
-        return False
-    
+        content = self.grid[row][col]
+        return content is None or (self.rules.strictChains and content is self.piece)
+
     def __manMove(self, coords: tuple) -> list:
         """
         Returns a list of possible man moves.
         """
         row, col = coords
+        rays = self.rays[row][col]
         moves = []
-        rowUp = (row + self.direction, col + 1)
-        if self.__withinBounds(rowUp):
-            if self.board.getSquareContent(rowUp) is None:
-                moves.append(rowUp)
-        rowDown = (row + self.direction, col - 1)
-        if self.__withinBounds(rowDown):
-            if self.board.getSquareContent(rowDown) is None:
-                moves.append(rowDown)
+        for direction in self.manSteps:
+            ray = rays[direction]
+            if ray and self.grid[ray[0][0]][ray[0][1]] is None:
+                moves.append(ray[0])
         return moves
 
-    def __manCapture(self, coords: tuple) -> list:
+    def __manCapture(self, coords: tuple, jumped: tuple) -> list:
         """
         Returns a list of possible man captures as
         a list of tuples.
         """
         row, col = coords
+        rays = self.rays[row][col]
         moves = []
-        targetUp = (row + self.direction, col + 1)
-        moveUp = (row + 2 * self.direction, col + 2)
-        if self.__withinBounds(targetUp) and self.__withinBounds(moveUp):
-            target = self.board.getSquareContent(targetUp)
-            if self.board.getSquareContent(moveUp) is None:
-                if target is not None:
-                    if target.getOwner() != self.piece.getOwner():
-                        moves.append((moveUp, target))
-        targetDown = (row + self.direction, col - 1)
-        moveDown = (row + 2 * self.direction, col - 2)
-        if self.__withinBounds(targetDown) and self.__withinBounds(moveDown):
-            target = self.board.getSquareContent(targetDown)
-            if self.board.getSquareContent(moveDown) is None:
-                if target is not None:
-                    if target.getOwner() != self.piece.getOwner():
-                        moves.append((moveDown, target))
+        for direction in self.manJumps:
+            ray = rays[direction]
+            if len(ray) > 1:
+                targetRow, targetCol = ray[0]
+                target = self.grid[targetRow][targetCol]
+                if target is not None and target.player != self.piece.player and ray[0] not in jumped:
+                    if self.__isFree(ray[1]):
+                        moves.append((ray[1], target))
         return moves
-    
+
     def __kingMove(self, coords: tuple) -> list:
         """
         Returns a list of possible king moves.
         """
+        row, col = coords
+        rays = self.rays[row][col]
         moves = []
-        directions = [ # Represents 4 diagonals
-            (1, 1), (-1, -1),
-            (1, -1), (-1, 1)
-        ]
-        for direction in directions:
-            row, col =  coords # Set coordinates
-            rowDir, colDir = direction # Set directions
-            while (self.__withinBounds((row, col))):
-                row += rowDir
-                col += colDir
-                moveCoords = (row, col)
-                if self.__withinBounds(moveCoords):
-                    if self.board.getSquareContent(moveCoords) is None:
-                        moves.append(moveCoords)
-                    else:
-                        break
+        for direction in DIRECTIONS:
+            for moveCoords in rays[direction]:
+                if self.grid[moveCoords[0]][moveCoords[1]] is not None:
+                    break
+                moves.append(moveCoords)
         return moves
 
-    def __kingCapture(self, coords: tuple, jumped: list) -> list:
+    def __kingCapture(self, coords: tuple, jumped: tuple) -> list:
         """
-        Returns a list of possible king captures as
-        a list of tuples.
+        Returns a list of possible king captures as a list of
+        tuples. The king lands right behind the captured piece,
+        or on any free square behind it under flyingLandings.
+        Pieces already jumped are passed over, unless
+        strictChains makes them block.
         """
+        row, col = coords
+        rays = self.rays[row][col]
+        strict = self.rules.strictChains
         moves = []
-        directions = [ # Represents 4 diagonals
-            (1, 1), (-1, -1),
-            (1, -1), (-1, 1)
-        ]
-        for direction in directions:
-            row, col =  coords # Set coordinates
-            rowDir, colDir = direction # Set directions
-            while (self.__withinBounds((row, col))):
-                row += rowDir
-                col += colDir
-                targetCoords = (row, col)
-                landingCoords = (row + rowDir, col + colDir)
-                if self.__withinBounds(targetCoords):
-                    target = self.board.getSquareContent(targetCoords)
-                    if target:
-                        if target.getCoords() not in jumped:
-                            if target.getOwner() != self.piece.getOwner():
-                                if self.__withinBounds(landingCoords):
-                                    if self.board.getSquareContent(landingCoords) is None:
-                                        moves.append((landingCoords, target))
-                                        break
-                                    else:
-                                        break
-                            elif target.getOwner() == self.piece.getOwner():
-                                break
-        return moves
\ No newline at end of file
+        for direction in DIRECTIONS:
+            ray = rays[direction]
+            for i, targetCoords in enumerate(ray):
+                target = self.grid[targetCoords[0]][targetCoords[1]]
+                if target is None or (strict and target is self.piece):
+                    continue
+                if targetCoords in jumped:
+                    if strict:
+                        break
+                    continue
+                if target.player != self.piece.player:
+                    for landingCoords in ray[i + 1:]:
+                        if not self.__isFree(landingCoords):
+                            break
+                        moves.append((landingCoords, target))
+                        if not self.rules.flyingLandings:
+                            break
+                break
+        return moves
@@ -0,0 +1,144 @@
+"""
+Parallel search by root splitting. Each iteration searches the first
+root move for an exact score, then the other root moves in parallel
+with a null window around it; the moves that fail high are searched
+again in parallel for their exact score. The best move is the first,
+in root order, with the best score: the move the sequential search
+picks at the same depth.
+"""
+import time
+import multiprocessing
+from .bitboard import Position
+from .search import Search, SearchResult, SearchTimeout, evaluate, MAX_DEPTH, WIN_SCORE
+from .transposition import TranspositionTable
+
+workerSearch: Search|None = None # Search of a worker process
+
+def initWorker(tableMegabytes: float = 0, options: dict|None = None) -> None:
+    """
+    Pool initializer: builds the Search of a worker process from
+    Search keyword options, with a table unless tableMegabytes is 0.
+    """
+    global workerSearch
+    table = TranspositionTable(tableMegabytes) if tableMegabytes else None
+    workerSearch = Search(table=table, **(options or dict()))
+
+def searchMoveTask(task: tuple) -> tuple:
+    """
+    Searches a root move in a worker. task is (position key, move,
+    depth, alpha, beta, seconds left). Returns (score, pv, nodes),
+    score being None if time ran out.
+    """
+    key, move, depth, alpha, beta, seconds = task
+    workerSearch.maxTime = seconds
+    if workerSearch.table is not None:
+        workerSearch.table.newSearch()
+    try:
+        score, pv = workerSearch.searchMove(Position(*key), move, depth, alpha, beta)
+    except SearchTimeout:
+        return None, [], workerSearch.nodes
+    return score, pv, workerSearch.nodes
+
+def orderRootMoves(moves: list, previousBest: tuple|None) -> list:
+    """
+    Orders root moves as Search does without a table: captures
+    taking the most pieces first, the previous best move first of all.
+    """
+    moves = sorted(moves, key=lambda move: move[2].bit_count(), reverse=True)
+    if previousBest in moves:
+        moves.remove(previousBest)
+        moves.insert(0, previousBest)
+    return moves
+
+class ParallelSearch:
+    """
+    Iterative deepening search splitting the root moves across a
+    pool of workers processes. Stops at maxDepth, or after the
+    iteration running when maxTime seconds have elapsed, returning
+    the last completed iteration. Workers may keep a private
+    transposition table of tableMegabytes. Use as a context manager,
+    or call close(), to stop the pool.
+    """
+
+    def __init__(self, workers: int = multiprocessing.cpu_count(), maxDepth: int = MAX_DEPTH,
+                 maxTime: float|None = None, tableMegabytes: float = 0) -> None:
+        self.workers: int = workers
+        self.maxDepth: int = maxDepth
+        self.maxTime: float|None = maxTime
+        self.nodes: int = 0
+        self.__pool = multiprocessing.Pool(workers, initWorker, (tableMegabytes,))
+
+    def __enter__(self) -> "ParallelSearch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.__pool.terminate()
+        self.__pool.join()
+
+    def __run(self, position: Position, tasks: list, deadline: float|None) -> list|None:
+        """
+        Searches (move, depth, alpha, beta) tasks in the pool.
+        Returns their (score, pv) results, None if time ran out.
+        """
+        seconds = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        results = self.__pool.map(searchMoveTask, [
+            (position.key(), move, depth, alpha, beta, seconds) for move, depth, alpha, beta in tasks
+        ], chunksize=1)
+        self.nodes += sum(nodes for _, _, nodes in results)
+        if any(score is None for score, _, _ in results):
+            return None
+        return [(score, pv) for score, pv, _ in results]
+
+    def __iteration(self, position: Position, moves: list, depth: int, deadline: float|None) -> tuple|None:
+        """
+        Searches moves to depth. Returns (score, pv) of the best
+        move, None if time ran out.
+        """
+        first = self.__run(position, [(moves[0], depth, -WIN_SCORE - 1, WIN_SCORE + 1)], deadline)
+        if first is None:
+            return None
+        best, bestPv = first[0]
+        others = moves[1:]
+        scouts = self.__run(position, [(move, depth, best, best + 1) for move in others], deadline)
+        if scouts is None:
+            return None
+        failHigh = [move for move, (score, _) in zip(others, scouts) if score > best]
+        exact = self.__run(position, [(move, depth, best, WIN_SCORE + 1) for move in failHigh], deadline)
+        if exact is None:
+            return None
+        for score, pv in exact: # In root order: only a strictly better score replaces the best
+            if score > best:
+                best, bestPv = score, pv
+        return best, bestPv
+
+    def search(self, position: Position) -> SearchResult:
+        """
+        Searches position and returns a SearchResult.
+        """
+        start = time.perf_counter()
+        deadline = start + self.maxTime if self.maxTime is not None else None
+        self.nodes = 0
+        result = SearchResult(None, evaluate(position), 0, [], 0, 0.0)
+        moves = position.legalMoves()
+        if not moves:
+            result.score = -WIN_SCORE
+            return result
+        result.bestMove = moves[0]
+        previousBest = None
+        for depth in range(1, self.maxDepth + 1):
+            found = self.__iteration(position, orderRootMoves(moves, previousBest), depth, deadline)
+            if found is None:
+                break
+            score, pv = found
+            previousBest = pv[0]
+            result = SearchResult(pv[0], score, depth, pv, self.nodes, time.perf_counter() - start)
+            if len(moves) == 1 or abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break # Forced move or forced win/loss found
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - start
+        return result
@@ -0,0 +1,328 @@
+"""
+Streaming PDN (Portable Draughts Notation) reader and writer. Games
+are read one at a time from any line iterator and replayed on a Board,
+each move checked against the MoveTree rules, so archives of any size
+are processed in constant memory.
+
+Squares are numbered 1 to 32 from the red side, red being PDN's first
+player ("Black"): red men start on 1-12, white men on 21-32.
+
+Usage: python -m checkers.pdn check FILE ...
+       python -m checkers.pdn convert [--out FILE] games.jsonl ...
+"""
+import re
+import sys
+import json
+import time
+import argparse
+from typing import NamedTuple
+from .board import Board
+from .game import Game
+from .moves import Move, MoveCache
+from .bitboard import SQUARES, coordsToSquare, squareToCoords, toMove
+from .constants import PLAYER_RED, PLAYER_WHITE
+
+RESULTS = {PLAYER_RED: "1-0", PLAYER_WHITE: "0-1", None: "1/2-1/2"} # By winner
+RESULT_TOKENS = {"1-0", "0-1", "1/2-1/2", "2-0", "0-2", "1-1", "*"}
+FEN_COLOURS = {PLAYER_RED: "B", PLAYER_WHITE: "W"}
+LINE_WIDTH = 79
+
+TOKEN = re.compile(r'\[\w+\s+"(?:[^"\\]|\\.)*"\]|[{}()]|[^\s{}()]+')
+TAG = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+MOVE = re.compile(r"^\d+(?:[-x]\d+)+$")
+MOVE_NUMBER = re.compile(r"^\d+\.+")
+
+class PdnError(ValueError):
+    """
+    Raised for a game record that cannot be read or replayed.
+    """
+
+class PdnGame(NamedTuple):
+    """
+    A game record as read: tags, move tokens and result.
+    """
+    tags: dict
+    moves: list
+    result: str = "*"
+
+# Squares and moves -------------------------------------------------------
+def toPdnSquare(coords: tuple) -> int:
+    """
+    Returns the PDN number, 1 to 32, of a dark square.
+    """
+    return SQUARES - coordsToSquare(coords)
+
+def fromPdnSquare(number: int) -> tuple:
+    """
+    Returns the coords of a PDN square number.
+    Raises PdnError if there is no such square.
+    """
+    if not 1 <= number <= SQUARES:
+        raise PdnError("No square {}".format(number))
+    return squareToCoords(SQUARES - number)
+
+def landings(move: Move) -> list:
+    """
+    Returns the squares a move lands on, in order. A capture
+    lands right behind each captured piece.
+    """
+    if not move.captures:
+        return [move.target]
+    squares = []
+    row, col = move.origin
+    for capturedRow, capturedCol in move.captures:
+        dRow = 1 if capturedRow > row else -1
+        dCol = 1 if capturedCol > col else -1
+        row, col = capturedRow + dRow, capturedCol + dCol
+        squares.append((row, col))
+    return squares
+
+def formatMove(move: Move) -> str:
+    """
+    Returns the PDN text of a move: "11-15", or every
+    landing square of a capture, "22x15x6".
+    """
+    separator = "x" if move.captures else "-"
+    return separator.join(str(toPdnSquare(coords)) for coords in [move.origin] + landings(move))
+
+def parseMove(text: str, legalMoves: list) -> Move:
+    """
+    Returns the legal move written as text.
+    Raises PdnError if none, or several, match.
+    """
+    if not MOVE.match(text):
+        raise PdnError("Not a move: {}".format(text))
+    path = [fromPdnSquare(int(number)) for number in re.split("[-x]", text)]
+    found = [move for move in legalMoves if move.origin == path[0] and move.target == path[-1]]
+    if len(path) > 2:
+        found = [move for move in found if landings(move) == path[1:]]
+    elif len(found) > 1: # "axb" is both a single jump and a longer chain ending on b
+        found = [move for move in found if landings(move) == path[1:]] or found
+    if len(found) != 1:
+        raise PdnError("{} move: {}".format("Illegal" if not found else "Ambiguous", text))
+    return found[0]
+
+# FEN ---------------------------------------------------------------------
+def toFen(board: Board, player: int) -> str:
+    """
+    Returns the FEN of a position: "B:W21,22,K30:B1,2,K3".
+    """
+    fields = [FEN_COLOURS[player]]
+    for owner in (PLAYER_WHITE, PLAYER_RED):
+        pieces = sorted(board.getPieces(owner), key=lambda piece: toPdnSquare(piece.getCoords()))
+        fields.append(FEN_COLOURS[owner] + ",".join(
+            ("K" if piece.king else "") + str(toPdnSquare(piece.getCoords())) for piece in pieces))
+    return ":".join(fields)
+
+def fromFen(fen: str) -> tuple:
+    """
+    Returns the (Board, player to move) of a FEN.
+    """
+    colours = {letter: player for player, letter in FEN_COLOURS.items()}
+    fields = fen.strip().rstrip(".").split(":")
+    if not fields or fields[0] not in colours:
+        raise PdnError("Bad FEN: {}".format(fen))
+    rows = [["."] * 8 for _ in range(8)]
+    for field in fields[1:]:
+        if not field or field[0] not in colours:
+            raise PdnError("Bad FEN: {}".format(fen))
+        char = "w" if colours[field[0]] == PLAYER_WHITE else "r"
+        for entry in filter(None, field[1:].split(",")):
+            king = entry.startswith("K")
+            try:
+                bounds = [int(number) for number in entry.lstrip("K").split("-")]
+            except ValueError:
+                raise PdnError("Bad FEN: {}".format(fen)) from None
+            for number in range(bounds[0], bounds[-1] + 1):
+                row, col = fromPdnSquare(number)
+                rows[row][col] = char.upper() if king else char
+    return Board.fromDiagram("\n".join("".join(row) for row in rows)), colours[fields[0]]
+
+# Reading -----------------------------------------------------------------
+def readGames(lines):
+    """
+    Yields a PdnGame for each game of lines, an iterable of text
+    lines such as an open file. Comments, variations and
+    annotations are skipped. Only one game is held at a time.
+    """
+    tags, moves = dict(), []
+    inComment, variations = False, 0
+    for line in lines:
+        for token in TOKEN.findall(line):
+            if inComment:
+                inComment = token != "}"
+            elif token == "{":
+                inComment = True
+            elif token == "(":
+                variations += 1
+            elif token == ")":
+                variations = max(0, variations - 1)
+            elif variations:
+                continue
+            elif token.startswith("["):
+                if moves: # Tags of the next game, previous one had no result
+                    yield PdnGame(tags, moves)
+                    tags, moves = dict(), []
+                name, value = TAG.match(token).groups()
+                tags[name] = value.replace('\\"', '"')
+            elif token in RESULT_TOKENS:
+                yield PdnGame(tags, moves, token)
+                tags, moves = dict(), []
+            elif not token.startswith("$"): # $n are annotation glyphs
+                token = MOVE_NUMBER.sub("", token).rstrip("!?")
+                if token:
+                    moves.append(token)
+    if tags or moves:
+        yield PdnGame(tags, moves)
+
+def startOf(record: PdnGame) -> tuple:
+    """
+    Returns the starting (Board, player to move) of a game.
+    """
+    if "FEN" in record.tags:
+        return fromFen(record.tags["FEN"])
+    return Board(), PLAYER_RED
+
+def replay(record: PdnGame, cache: MoveCache|None = None):
+    """
+    Replays a game on a Board, yielding (board, player, move)
+    before each move is made. Raises PdnError on the first
+    move that is not legal. The board goes through cache if
+    given, which pays off across games sharing openings.
+    """
+    board, player = startOf(record)
+    board.moveCache = cache
+    for ply, text in enumerate(record.moves):
+        try:
+            move = parseMove(text, board.legalMoves(player))
+        except PdnError as error:
+            raise PdnError("Ply {}: {}".format(ply + 1, error)) from None
+        yield board, player, move
+        board.makeMove(move, player)
+        player = 1 - player
+
+def loadGame(record: PdnGame) -> Game:
+    """
+    Returns the Game reached at the end of a game record.
+    """
+    board, player = startOf(record)
+    game = Game.fromBoard(board, player)
+    for ply, text in enumerate(record.moves):
+        try:
+            move = parseMove(text, game.legalMoves())
+        except PdnError as error:
+            raise PdnError("Ply {}: {}".format(ply + 1, error)) from None
+        game.playMove(move)
+    return game
+
+# Writing -----------------------------------------------------------------
+def writeGame(stream, moves, result: str = "*", tags: dict|None = None,
+              start: Board|None = None, player: int = PLAYER_RED) -> None:
+    """
+    Writes a game of Moves to stream. A start other than the
+    initial position is written as a FEN tag.
+    """
+    tags = {"Event": "?", "GameType": "21", **(tags or {})}
+    if start is not None:
+        tags["FEN"] = toFen(start, player)
+    tags["Result"] = result
+    for name, value in tags.items():
+        stream.write('[{} "{}"]\n'.format(name, str(value).replace('"', '\\"')))
+    stream.write("\n")
+    line = ""
+    tokens = ["1..."] if player == PLAYER_WHITE else []
+    for ply, move in enumerate(moves):
+        if (ply + (player == PLAYER_WHITE)) % 2 == 0:
+            tokens.append("{}.".format((ply + (player == PLAYER_WHITE)) // 2 + 1))
+        tokens.append(formatMove(move))
+    for token in tokens + [result]:
+        if line and len(line) + 1 + len(token) > LINE_WIDTH:
+            stream.write(line + "\n")
+            line = token
+        else:
+            line = line + " " + token if line else token
+    stream.write(line + "\n\n")
+
+def saveGame(game: Game, stream, tags: dict|None = None) -> None:
+    """
+    Writes the moves played in a Game to stream.
+    """
+    history = list(game.board.history)
+    for _ in history: # Walk back to the starting position, then forward again
+        game.board.unmakeMove()
+    player = history[0].turn if history else game.turn
+    start = None
+    if game.board.hash != Board().hash or player != PLAYER_RED:
+        start = Board.fromDiagram(game.board.toDiagram())
+    for undo in history:
+        game.board.makeMove(undo.move, undo.turn)
+    result = RESULTS[game.turn] if game.endGame else "*"
+    writeGame(stream, [undo.move for undo in history], result, tags, start, player)
+
+def selfPlayGame(record: dict, cache: MoveCache|None = None) -> tuple:
+    """
+    Returns (moves, result) of a checkers.selfplay record,
+    its bitboard moves turned into Moves in jump order,
+    replayed through cache if given.
+    """
+    board, player = Board(), PLAYER_RED
+    board.moveCache = cache
+    moves = []
+    for move in record["moves"]:
+        loose = toMove(tuple(move))
+        for legal in board.legalMoves(player):
+            if (legal.origin, legal.target, set(legal.captures)) == (loose.origin, loose.target, set(loose.captures)):
+                break
+        else:
+            raise PdnError("Game {}: illegal move {}".format(record.get("game"), move))
+        board.makeMove(legal, player)
+        moves.append(legal)
+        player = 1 - player
+    winner = {"red": PLAYER_RED, "white": PLAYER_WHITE}.get(record["winner"])
+    return moves, RESULTS[winner]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PDN game records.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    checker = commands.add_parser("check", help="replay PDN files against the rules")
+    checker.add_argument("files", nargs="+")
+    converter = commands.add_parser("convert", help="write self-play JSONL games as PDN")
+    converter.add_argument("files", nargs="+")
+    converter.add_argument("--out", default="-")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "convert":
+        out = sys.stdout if args.out == "-" else open(args.out, "w")
+        try:
+            for path in args.files:
+                with open(path) as file:
+                    for line in file:
+                        if line.strip():
+                            record = json.loads(line)
+                            moves, result = selfPlayGame(record)
+                            writeGame(out, moves, result, {"Event": "selfplay", "Round": record["game"],
+                                                           "Black": record["red"], "White": record["white"]})
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return 0
+
+    games = plies = errors = 0
+    for path in args.files:
+        with open(path) as file:
+            for number, record in enumerate(readGames(file), 1):
+                games += 1
+                try:
+                    for _ in replay(record):
+                        plies += 1
+                except PdnError as error:
+                    errors += 1
+                    sys.stderr.write("{} game {}: {}\n".format(path, number, error))
+    seconds = time.perf_counter() - start
+    print("{} games, {} plies, {} errors, {:.1f}s, {:.0f} plies/s".format(
+        games, plies, errors, seconds, plies / seconds if seconds > 0 else 0.0))
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
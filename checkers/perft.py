@@ -0,0 +1,167 @@
+"""
+Perft harness. Counts the leaf nodes of the move tree from reference
+positions, checks them against stored values and reports nodes per
+second. Runs headless.
+
+Usage: python -m checkers.perft [--engine tree|bitboard] [--depth N] [--stats] [--cache N] [position ...]
+"""
+import sys
+import time
+import argparse
+from .board import Board
+from .bitboard import Position
+from .moves import MoveTree, MoveCache
+from .rules import CHECKERS, INTERNATIONAL
+from .constants import PLAYER_RED, PLAYER_WHITE
+
+# Reference positions: diagram, player to move, expected node counts
+# by depth. Diagrams are read by Board.fromDiagram.
+POSITIONS = {
+    "initial": ("""
+        .w.w.w.w
+        w.w.w.w.
+        .w.w.w.w
+        ........
+        ........
+        r.r.r.r.
+        .r.r.r.r
+        r.r.r.r.
+    """, PLAYER_RED, {1: 7, 2: 49, 3: 302, 4: 1469, 5: 7361, 6: 37205, 7: 182906}),
+    "kings": ("""
+        .....W..
+        ..w.....
+        ........
+        ..w.....
+        .......r
+        ..w.....
+        ........
+        R.......
+    """, PLAYER_RED, {1: 3, 2: 9, 3: 45, 4: 322, 5: 2268, 6: 15904, 7: 120690}),
+    "promotion": ("""
+        ........
+        r.r.....
+        .w......
+        ........
+        ........
+        ......r.
+        .....w.w
+        ........
+    """, PLAYER_RED, {1: 5, 2: 25, 3: 117, 4: 586, 5: 3613, 6: 20730, 7: 148987}),
+    "centre": ("""
+        .w.w.w.w
+        w.w.w...
+        .w...w.w
+        w.w.w...
+        ...r.r.r
+        r.r...r.
+        .r.r.r.r
+        r.r.r...
+    """, PLAYER_RED, {1: 1, 2: 3, 3: 15, 4: 64, 5: 282, 6: 1036, 7: 4217}),
+    "flying": ("""
+        .W......
+        ........
+        ...r....
+        ........
+        .r...r..
+        ........
+        .....W..
+        R.......
+    """, PLAYER_WHITE, {1: 2, 2: 11, 3: 107, 4: 919, 5: 8661, 6: 69891, 7: 675077}),
+    "branches": ("""
+        ........
+        ..w.w...
+        ........
+        ..w.w...
+        ........
+        ..w.w...
+        ...R....
+        ........
+    """, PLAYER_RED, {1: 14, 2: 56, 3: 195, 4: 813, 5: 4453, 6: 22083, 7: 124347}),
+    "intl": ("""
+        .w.w.w.w.w
+        w.w.w.w.w.
+        .w.w.w.w.w
+        w.w.w.w.w.
+        ..........
+        ..........
+        .r.r.r.r.r
+        r.r.r.r.r.
+        .r.r.r.r.r
+        r.r.r.r.r.
+    """, PLAYER_RED, {1: 9, 2: 81, 3: 658, 4: 4265, 5: 27117, 6: 167140, 7: 1049442}),
+}
+# Positions of other variants than checkers. The bitboard engine only plays checkers.
+RULES = {"intl": INTERNATIONAL}
+
+# Default depth of each position, kept low enough for the tree engine.
+DEPTHS = {"initial": 5, "kings": 5, "promotion": 5, "centre": 6, "flying": 5, "branches": 5, "intl": 5}
+
+def perft(board: Board, player: int, depth: int) -> int:
+    """
+    Counts the leaf nodes of the move tree to depth,
+    using Board.legalMoves() and make/unmake.
+    """
+    moves = board.legalMoves(player)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        board.makeMove(move, player)
+        nodes += perft(board, 1 - player, depth - 1)
+        board.unmakeMove()
+    return nodes
+
+def runPerft(name: str, depth: int, engine: str = "tree", cache: MoveCache|None = None) -> tuple:
+    """
+    Runs perft on a reference position, the tree engine
+    going through cache if given. Returns (nodes, seconds).
+    """
+    diagram, player, _ = POSITIONS[name]
+    board = Board.fromDiagram(diagram, RULES.get(name, CHECKERS))
+    board.moveCache = cache
+    start = time.perf_counter()
+    if engine == "bitboard":
+        nodes = Position.fromBoard(board, player).perft(depth)
+    else:
+        nodes = perft(board, player, depth)
+    return nodes, time.perf_counter() - start
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Perft move generation check.")
+    parser.add_argument("positions", nargs="*", default=list(POSITIONS))
+    parser.add_argument("--engine", choices=["tree", "bitboard"], default="tree")
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--stats", action="store_true", help="dump MoveTree counters as JSON")
+    parser.add_argument("--cache", type=int, default=0, help="MoveCache size for the tree engine, dumped as JSON")
+    args = parser.parse_args()
+    if args.stats:
+        MoveTree.enableStats()
+    cache = MoveCache(args.cache) if args.cache else None
+
+    failed = 0
+    totalNodes, totalTime = 0, 0.0
+    print("{:<10} {:>5} {:>10} {:>10} {:>8} {:>10}".format(
+        "position", "depth", "nodes", "expected", "seconds", "nodes/s"))
+    for name in args.positions:
+        if args.engine == "bitboard" and name in RULES:
+            continue
+        depth = args.depth or DEPTHS[name]
+        nodes, seconds = runPerft(name, depth, args.engine, cache)
+        expected = POSITIONS[name][2].get(depth)
+        status = "" if expected is None else ("ok" if nodes == expected else "FAIL")
+        failed += status == "FAIL"
+        totalNodes += nodes
+        totalTime += seconds
+        print("{:<10} {:>5} {:>10} {:>10} {:>8.2f} {:>10.0f} {}".format(
+            name, depth, nodes, expected if expected is not None else "-",
+            seconds, nodes / seconds, status))
+    print("{:<10} {:>5} {:>10} {:>10} {:>8.2f} {:>10.0f}".format(
+        "total", "", totalNodes, "", totalTime, totalNodes / totalTime))
+    if args.stats:
+        MoveTree.disableStats().dump(sys.stdout)
+    if cache is not None:
+        cache.dump(sys.stdout)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
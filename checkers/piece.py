@@ -1,22 +1,19 @@
-import pygame
-from pygame.surface import Surface
-from .constants import SQUARE_SIZE, GREY, BLACK, CROWN, ROWS
+from .constants import ROWS, PLAYER_WHITE
 
 class Piece:
+    """
+    Rules-level piece: owner, coordinates and king status.
+    Colours, pixel positions and selection are rendering state
+    and live in checkers.gui.
+    """
 
-    PIECES_RADIUS = SQUARE_SIZE // 2 * .68
-    PADDING_RADIUS = SQUARE_SIZE // 2 * .75
+    __slots__ = ("player", "king", "row", "col")
 
-    def __init__(self, color, player, row, col) -> None:
-        self.color = color
+    def __init__(self, player, row, col, king: bool = False) -> None:
         self.player = player
-        self.king: bool = False
+        self.king: bool = king
         self.row: int = row
         self.col: int = col
-        self.position: tuple = (None, None)
-        self.selected = False
-        
-        self.__computePosition()
     
     def __repr__(self) -> str:
         return "{0}".format(self.getCoords())
@@ -26,13 +23,6 @@ class Piece:
         Makes man king.
         """
         self.king = True
-    
-    def updateSelectedStatus(self) -> None:
-        """
-        Updates a peice selected status.
-        The selected piece is highlighted in the GUI.
-        """
-        self.selected = not self.selected
 
     def getCoords(self) -> tuple:
         """
@@ -46,35 +36,21 @@ class Piece:
         """
         return self.player
 
-    def move(self, coords: tuple):
+    def move(self, coords: tuple, lastRow: int = ROWS - 1):
         """
-        Updates piece coordinates, then compute new position.
+        Updates piece coordinates, promoting
+        the piece on the far row of its owner.
         """
         self.row, self.col = coords
-        self.__computePosition()
-        if (self.row == (ROWS - 1)) or (self.row == 0):
+        if self.row == (lastRow if self.player == PLAYER_WHITE else 0):
             self.__makeKing()
-    
-    # GUI ---------------------------------------------------------------------
-    def __computePosition(self) -> None:
-        self.position = (
-            self.row * SQUARE_SIZE + SQUARE_SIZE // 2,
-            self.col * SQUARE_SIZE + SQUARE_SIZE // 2
-        )
-    
-    def drawPiece(self, win: Surface) -> None:
+
+    def undoMove(self, coords: tuple, promoted: bool) -> None:
         """
-        Draws piece to GUI.
+        Moves piece back to coords, without promotion.
+        Turns a king back into a man if the move
+        being undone promoted it.
         """
-        if self.selected:
-            pygame.draw.circle(win, BLACK, self.position, self.PADDING_RADIUS)
-        else:
-            pygame.draw.circle(win, GREY, self.position, self.PADDING_RADIUS)
-        pygame.draw.circle(win, self.color, self.position, self.PIECES_RADIUS)
-        if self.king:
-            x, y = self.position
-            win.blit(CROWN,
-                (x - CROWN.get_width()//2, y - CROWN.get_height()//2)
-            )
-
-        
\ No newline at end of file
+        self.row, self.col = coords
+        if promoted:
+            self.king = False
@@ -0,0 +1,70 @@
+"""
+Rules variants. A Rules gives the board size, the rows of men each
+side starts with and how pieces capture. Board and MoveTree honour
+it, reading the SquareTables of its size: diagonal rays of every
+playable square, built once per size, so the move generator never
+tests bounds and a 50-square board costs the same per node as a
+32-square one.
+"""
+from typing import NamedTuple
+from .constants import ROWS, PIECES_ROWS
+
+class Rules(NamedTuple):
+    """
+    A rules variant. Men always move forward; the fields
+    below are what variants differ on.
+    """
+    name: str
+    size: int # Rows and columns
+    piecesRows: int # Rows of men each player starts with
+    menCaptureBackwards: bool = False
+    flyingLandings: bool = False # A capturing king may stop on any free square behind the piece
+    majorityCapture: bool = False # Only the captures taking the most pieces are legal
+    strictChains: bool = False # Jumped pieces block the chain, the starting square is free
+
+CHECKERS = Rules("checkers", ROWS, PIECES_ROWS)
+INTERNATIONAL = Rules("international", 10, 4, menCaptureBackwards=True, flyingLandings=True,
+                      majorityCapture=True, strictChains=True)
+VARIANTS = {rules.name: rules for rules in (CHECKERS, INTERNATIONAL)}
+
+DIRECTIONS = [ # Represents 4 diagonals, in MoveTree's king order
+    (1, 1), (-1, -1),
+    (1, -1), (-1, 1)
+]
+
+class SquareTables:
+    """
+    Square indexing of a size x size board. rays[row][col] maps
+    each diagonal direction to the squares along it, nearest
+    first; light squares hold None.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.squares: int = size * size // 2 # Playable squares
+        self.rays: list = [[None] * size for _ in range(size)]
+        for row in range(size):
+            for col in range((row + 1) % 2, size, 2):
+                self.rays[row][col] = {direction: self.__ray(row, col, direction) for direction in DIRECTIONS}
+
+    def __ray(self, row: int, col: int, direction: tuple) -> tuple:
+        """
+        Returns every square along direction from (row, col).
+        """
+        rowDir, colDir = direction
+        ray = []
+        row, col = row + rowDir, col + colDir
+        while 0 <= row < self.size and 0 <= col < self.size:
+            ray.append((row, col))
+            row, col = row + rowDir, col + colDir
+        return tuple(ray)
+
+__tables: dict = dict() # Size -> SquareTables
+
+def tablesOf(size: int) -> SquareTables:
+    """
+    Returns the SquareTables of a board size, built on first use.
+    """
+    if size not in __tables:
+        __tables[size] = SquareTables(size)
+    return __tables[size]
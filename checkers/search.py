@@ -0,0 +1,194 @@
+import time
+from .bitboard import Position
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER
+from .constants import PLAYER_WHITE
+
+# Scores are in hundredths of a man, from the side to move's view.
+WIN_SCORE = 100000
+MAX_DEPTH = 64
+WON = WIN_SCORE - 1000 # Scores beyond this are wins in a number of plies
+
+def evaluate(position: Position) -> int:
+    """
+    Static evaluation of position from the side to move's view:
+    the piece-square score of checkers.evaluation, which
+    Position.play keeps up to date, so a leaf costs O(1).
+    """
+    return position.score if position.turn == PLAYER_WHITE else -position.score
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the node or time budget is spent.
+    """
+
+class SearchResult:
+    """
+    Outcome of a search: best move, score, principal variation
+    and statistics of the last completed iteration.
+    """
+
+    def __init__(self, bestMove: tuple|None, score: int, depth: int, pv: list,
+                 nodes: int, seconds: float) -> None:
+        self.bestMove: tuple|None = bestMove
+        self.score: int = score
+        self.depth: int = depth
+        self.pv: list = pv
+        self.nodes: int = nodes
+        self.seconds: float = seconds
+
+    def __repr__(self) -> str:
+        return "depth {} score {} nodes {} nps {:.0f} pv {}".format(
+            self.depth, self.score, self.nodes, self.nps(), self.pv
+        )
+
+    def nps(self) -> float:
+        """
+        Returns the search speed in nodes per second.
+        """
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+class Search:
+    """
+    Iterative deepening alpha-beta search (negamax) over bitboard
+    positions. Stops at maxDepth, or once maxNodes nodes have been
+    searched or maxTime seconds have elapsed; the result of the last
+    completed iteration is returned. An optional TranspositionTable
+    is shared across iterations and searches.
+    """
+
+    CHECK_EVERY = 1023 # Budget is checked every CHECK_EVERY + 1 nodes
+
+    def __init__(self, maxDepth: int = MAX_DEPTH, maxNodes: int|None = None,
+                 maxTime: float|None = None, table: TranspositionTable|None = None) -> None:
+        self.maxDepth: int = maxDepth
+        self.maxNodes: int|None = maxNodes
+        self.maxTime: float|None = maxTime
+        self.table: TranspositionTable|None = table
+        self.nodes: int = 0
+        self.__deadline: float|None = None
+        self.__pvMoves: list = []
+
+    # Search ------------------------------------------------------------------
+    def search(self, position: Position) -> SearchResult:
+        """
+        Searches position and returns a SearchResult.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.__deadline = start + self.maxTime if self.maxTime is not None else None
+        self.__pvMoves = []
+        if self.table is not None:
+            self.table.newSearch()
+        result = SearchResult(None, evaluate(position), 0, [], 0, 0.0)
+        moves = position.legalMoves()
+        if not moves:
+            result.score = -WIN_SCORE
+            return result
+        result.bestMove = moves[0]
+        for depth in range(1, self.maxDepth + 1):
+            pv = []
+            try:
+                score = self.__negamax(position, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0, pv)
+            except SearchTimeout:
+                break
+            self.__pvMoves = pv
+            result = SearchResult(pv[0], score, depth, pv, self.nodes, time.perf_counter() - start)
+            if len(moves) == 1 or abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break # Forced move or forced win/loss found
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def searchMove(self, position: Position, move: tuple, depth: int, alpha: int, beta: int) -> tuple:
+        """
+        Searches a single root move of position to depth within the
+        root window (alpha, beta), as the root of search() does.
+        Returns (score, pv), pv starting with move. Used to split
+        the root moves of a search across processes.
+        """
+        self.nodes = 0
+        self.__deadline = time.perf_counter() + self.maxTime if self.maxTime is not None else None
+        self.__pvMoves = []
+        pv = []
+        score = -self.__negamax(position.play(move), depth - 1, -beta, -alpha, 1, pv)
+        return score, [move] + pv
+
+    def __checkBudget(self) -> None:
+        """
+        Raises SearchTimeout once the budget is spent.
+        """
+        if self.maxNodes is not None and self.nodes >= self.maxNodes:
+            raise SearchTimeout()
+        if self.__deadline is not None and time.perf_counter() >= self.__deadline:
+            raise SearchTimeout()
+
+    def __orderMoves(self, moves: list, ply: int, tableMove: tuple|None) -> list:
+        """
+        Orders moves: previous principal variation move first,
+        then the transposition table move, then the captures
+        taking the most pieces.
+        """
+        moves.sort(key=lambda move: move[2].bit_count(), reverse=True)
+        for first in (tableMove, self.__pvMoves[ply] if ply < len(self.__pvMoves) else None):
+            if first is not None and first in moves:
+                moves.remove(first)
+                moves.insert(0, first)
+        return moves
+
+    def __negamax(self, position: Position, depth: int, alpha: int, beta: int,
+                  ply: int, pv: list) -> int:
+        """
+        Returns the score of position and fills pv with its
+        principal variation. Captures are searched past depth 0
+        until the position is quiet.
+        """
+        self.nodes += 1
+        if not self.nodes & self.CHECK_EVERY:
+            self.__checkBudget()
+        tableMove = None
+        if self.table is not None:
+            entry = self.table.probe(position.zobrist)
+            if entry is not None:
+                tableDepth, bound, score, tableMove = entry
+                if ply > 0 and tableDepth >= max(depth, 0):
+                    score = self.__fromTable(score, ply)
+                    if (bound == EXACT or (bound == LOWER and score >= beta)
+                            or (bound == UPPER and score <= alpha)):
+                        return score
+        moves = position.legalMoves()
+        if not moves:
+            return -WIN_SCORE + ply # Side to move has lost
+        if depth <= 0 and (not moves[0][2] or ply >= MAX_DEPTH):
+            return evaluate(position)
+        alphaStart = alpha
+        best, bestMove = -WIN_SCORE - 1, None
+        childPv = []
+        for move in self.__orderMoves(moves, ply, tableMove):
+            childPv.clear()
+            score = -self.__negamax(position.play(move), depth - 1, -beta, -alpha, ply + 1, childPv)
+            if score > best:
+                best, bestMove = score, move
+                if score > alpha:
+                    alpha = score
+                    pv[:] = [move] + childPv
+                    if alpha >= beta:
+                        break
+        if self.table is not None:
+            bound = UPPER if best <= alphaStart else LOWER if best >= beta else EXACT
+            self.table.store(position.zobrist, max(depth, 0), bound, self.__toTable(best, ply), bestMove)
+        return best
+
+    # Win scores are stored relative to the node, not the root
+    def __toTable(self, score: int, ply: int) -> int:
+        if score > WON:
+            return score + ply
+        if score < -WON:
+            return score - ply
+        return score
+
+    def __fromTable(self, score: int, ply: int) -> int:
+        if score > WON:
+            return score - ply
+        if score < -WON:
+            return score + ply
+        return score
@@ -0,0 +1,161 @@
+"""
+Headless self-play. Plays games between move policies across a
+process pool and streams one JSON line per game to a file as games
+finish, then reports throughput.
+
+Usage: python -m checkers.selfplay [--games N] [--workers N] [--red POLICY]
+                                   [--white POLICY] [--nodes N] [--out FILE]
+Policies: random, greedy, search, mcts.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import multiprocessing
+from .bitboard import Position
+from .search import Search, evaluate
+from .mcts import Mcts
+from .constants import PLAYER_RED, PLAYER_WHITE
+
+MAX_PLIES = 300 # Games still running after this many plies are draws
+
+# Policies ----------------------------------------------------------------
+# A policy is called with (position, rng) and returns one of
+# position.legalMoves(). Factories take the search node budget.
+def randomPolicy(nodes: int):
+    """
+    Plays a uniformly random legal move.
+    """
+    def policy(position: Position, rng: random.Random) -> tuple:
+        return rng.choice(position.legalMoves())
+    return policy
+
+def greedyPolicy(nodes: int):
+    """
+    Plays the move with the best static evaluation,
+    breaking ties at random.
+    """
+    def policy(position: Position, rng: random.Random) -> tuple:
+        moves = position.legalMoves()
+        scores = [-evaluate(position.play(move)) for move in moves]
+        best = max(scores)
+        return rng.choice([move for move, score in zip(moves, scores) if score == best])
+    return policy
+
+def searchPolicy(nodes: int):
+    """
+    Plays the best move of an alpha-beta search limited to nodes.
+    """
+    search = Search(maxNodes=nodes)
+    def policy(position: Position, rng: random.Random) -> tuple:
+        return search.search(position).bestMove
+    return policy
+
+def mctsPolicy(nodes: int):
+    """
+    Plays the most visited move of a Monte Carlo tree
+    search limited to nodes playouts.
+    """
+    search = Mcts(maxPlayouts=nodes)
+    def policy(position: Position, rng: random.Random) -> tuple:
+        return search.search(position).bestMove
+    return policy
+
+POLICIES = {
+    "random": randomPolicy,
+    "greedy": greedyPolicy,
+    "search": searchPolicy,
+    "mcts": mctsPolicy,
+}
+
+# Games -------------------------------------------------------------------
+def playGame(task: tuple) -> dict:
+    """
+    Plays one game. task is (index, seed, red policy name,
+    white policy name, search nodes, max plies).
+    Returns the game record.
+    """
+    index, seed, red, white, nodes, maxPlies = task
+    rng = random.Random(seed)
+    policies = {
+        PLAYER_RED: POLICIES[red](nodes),
+        PLAYER_WHITE: POLICIES[white](nodes),
+    }
+    position = Position.initial()
+    moves = []
+    winner = None
+    start = time.perf_counter()
+    while len(moves) < maxPlies:
+        if not position.legalMoves():
+            winner = 1 - position.turn # Side to move has lost
+            break
+        move = policies[position.turn](position, rng)
+        moves.append(list(move))
+        position = position.play(move)
+    return {
+        "game": index,
+        "seed": seed,
+        "red": red,
+        "white": white,
+        "winner": {PLAYER_RED: "red", PLAYER_WHITE: "white", None: "draw"}[winner],
+        "plies": len(moves),
+        "seconds": round(time.perf_counter() - start, 4),
+        "moves": moves, # [origin, target, captured] bitboard moves
+    }
+
+def selfPlay(games: int, workers: int, red: str, white: str, nodes: int,
+             out, seed: int = 0, maxPlies: int = MAX_PLIES, progress=None) -> dict:
+    """
+    Plays games across workers processes, writing each record to
+    out as a JSON line as soon as its game finishes.
+    Returns a summary with results and games per second.
+    """
+    tasks = ((index, seed + index, red, white, nodes, maxPlies) for index in range(games))
+    results = {"red": 0, "white": 0, "draw": 0}
+    plies = 0
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for done, record in enumerate(pool.imap_unordered(playGame, tasks, chunksize=1), 1):
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+            results[record["winner"]] += 1
+            plies += record["plies"]
+            if progress is not None:
+                progress(done, time.perf_counter() - start)
+    seconds = time.perf_counter() - start
+    return {
+        "games": games,
+        "workers": workers,
+        "results": results,
+        "plies": plies,
+        "seconds": round(seconds, 3),
+        "gamesPerSecond": round(games / seconds, 2) if seconds > 0 else 0.0,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Headless self-play.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--red", choices=list(POLICIES), default="search")
+    parser.add_argument("--white", choices=list(POLICIES), default="random")
+    parser.add_argument("--nodes", type=int, default=2000, help="search policy node budget")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    parser.add_argument("--out", default="-", help="JSONL output file, - for stdout")
+    args = parser.parse_args()
+
+    def progress(done: int, seconds: float) -> None:
+        sys.stderr.write("\r{} games, {:.1f} games/s".format(done, done / seconds))
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    try:
+        summary = selfPlay(args.games, args.workers, args.red, args.white, args.nodes,
+                           out, args.seed, args.max_plies, progress)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    sys.stderr.write("\n" + json.dumps(summary) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Game server. Hosts many headless games from one asyncio process over
+a line-based TCP protocol: each request and each reply is one JSON
+object per line. Moves are written in PDN and checked against the
+MoveTree rules; clients watching a game are pushed the squares each
+move changes.
+
+Requests, with an optional "id" echoed in the reply:
+    {"op": "new"}                              creates a game and watches it
+    {"op": "join", "game": ID}                 watches a game
+    {"op": "state", "game": ID}                full state of a game
+    {"op": "move", "game": ID, "move": "11-15"}
+    {"op": "leave", "game": ID}                stops watching a game
+    {"op": "close", "game": ID}                deletes a game
+Replies are {"ok": true, ...} or {"ok": false, "error": ...}, the
+error being a protocol message such as "no game 7". Watchers
+get {"event": "diff", "game": ID, "ply": N, "squares": {square: piece
+or null}, "turn", "moves", "end", "winner"} after each move.
+
+Sessions idle for a while are parked as packed codec records, so
+thousands of idle games cost a few hundred bytes each.
+
+Usage: python -m checkers.server [--host HOST] [--port PORT] [--idle SECONDS]
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+from . import codec, pdn
+from .game import Game
+from .constants import PLAYER_RED, PLAYER_WHITE
+
+HOST, PORT = "127.0.0.1", 8765
+IDLE_TIMEOUT = 60.0 # Seconds before an untouched session is parked
+SWEEP_EVERY = 10.0
+NAMES = {PLAYER_RED: "red", PLAYER_WHITE: "white"}
+
+class ProtocolError(ValueError):
+    """
+    Raised for a request the server cannot serve. Its
+    message is sent back to the client as the error.
+    """
+
+def squaresOf(game: Game) -> dict:
+    """
+    Returns the pieces of a game by PDN square: "r", "R", "w" or "W".
+    """
+    squares = dict()
+    for player in (PLAYER_RED, PLAYER_WHITE):
+        for piece in game.board.getPieces(player):
+            char = "w" if player == PLAYER_WHITE else "r"
+            squares[pdn.toPdnSquare(piece.getCoords())] = char.upper() if piece.king else char
+    return squares
+
+class Session:
+    """
+    One hosted game and the clients watching it. The Game is
+    dropped while parked and rebuilt from its record on use.
+    """
+
+    __slots__ = ("id", "game", "record", "ply", "watchers", "lastActive")
+
+    def __init__(self, id: int) -> None:
+        self.id: int = id
+        self.game: Game|None = Game()
+        self.record: bytes|None = None
+        self.ply: int = 0
+        self.watchers: set = set()
+        self.lastActive: float = time.monotonic()
+
+    def getGame(self) -> Game:
+        """
+        Returns the session's Game, unparking it if needed.
+        """
+        self.lastActive = time.monotonic()
+        if self.game is None:
+            board, turn = codec.decodeBoard(self.record)
+            self.game = Game.fromBoard(board, turn)
+            self.record = None
+        return self.game
+
+    def park(self) -> None:
+        """
+        Replaces the Game by its packed record. A finished game is
+        stored with its loser to move, which Game.fromBoard ends again.
+        """
+        if self.game is not None:
+            turn = 1 - self.game.turn if self.game.endGame else self.game.turn
+            self.record = codec.encodeBoard(self.game.board, turn)
+            self.game = None
+
+    def state(self) -> dict:
+        """
+        Returns the full state of the game.
+        """
+        game = self.getGame()
+        return {
+            "game": self.id,
+            "ply": self.ply,
+            "squares": squaresOf(game),
+            **self.status(game),
+        }
+
+    def status(self, game: Game) -> dict:
+        return {
+            "turn": NAMES[game.turn],
+            "moves": [] if game.endGame else [pdn.formatMove(move) for move in game.legalMoves()],
+            "end": game.endGame,
+            "winner": NAMES[game.turn] if game.endGame else None,
+        }
+
+class GameServer:
+    """
+    asyncio TCP server holding a registry of game sessions.
+    """
+
+    def __init__(self, host: str = HOST, port: int = PORT, idleTimeout: float = IDLE_TIMEOUT) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.idleTimeout: float = idleTimeout
+        self.sessions: dict = dict()
+        self.moves: int = 0
+        self.__nextId: int = 1
+        self.__server: asyncio.Server|None = None
+        self.__sweeper: asyncio.Task|None = None
+        self.__connections: set = set()
+
+    async def start(self) -> None:
+        """
+        Starts listening. With port 0 the bound port is stored in port.
+        """
+        self.__server = await asyncio.start_server(self.__handle, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+        self.__sweeper = asyncio.create_task(self.__sweep())
+
+    async def serveForever(self) -> None:
+        await self.start()
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    async def close(self) -> None:
+        if self.__sweeper is not None:
+            self.__sweeper.cancel()
+        if self.__server is not None:
+            self.__server.close()
+            for writer in list(self.__connections):
+                writer.close()
+            while self.__connections: # Let the handlers see end of stream
+                await asyncio.sleep(0)
+            await self.__server.wait_closed()
+
+    # Sessions ----------------------------------------------------------------
+    def newSession(self) -> Session:
+        session = Session(self.__nextId)
+        self.sessions[session.id] = session
+        self.__nextId += 1
+        return session
+
+    def parkIdle(self, idleTimeout: float|None = None) -> int:
+        """
+        Parks sessions idle for more than idleTimeout seconds.
+        Returns the number parked.
+        """
+        limit = time.monotonic() - (self.idleTimeout if idleTimeout is None else idleTimeout)
+        parked = 0
+        for session in self.sessions.values():
+            if session.game is not None and session.lastActive <= limit:
+                session.park()
+                parked += 1
+        return parked
+
+    async def __sweep(self) -> None:
+        while True:
+            await asyncio.sleep(SWEEP_EVERY)
+            self.parkIdle()
+
+    # Protocol ----------------------------------------------------------------
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        watching = set()
+        self.__connections.add(writer)
+        try:
+            while line := await reader.readline():
+                request = None
+                try:
+                    request = self.__parse(line)
+                    reply = await self.__dispatch(request, writer, watching)
+                except (ProtocolError, pdn.PdnError) as error: # Both carry a message for the client
+                    reply = {"ok": False, "error": str(error)}
+                if request is not None and "id" in request:
+                    reply["id"] = request["id"]
+                writer.write(json.dumps(reply, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for id in watching:
+                if id in self.sessions:
+                    self.sessions[id].watchers.discard(writer)
+            self.__connections.discard(writer)
+            writer.close()
+
+    def __parse(self, line: bytes) -> dict:
+        """
+        Decodes a request line. Raises ProtocolError
+        unless it holds a JSON object.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError: # Includes bad UTF-8
+            raise ProtocolError("request must be JSON") from None
+        if not isinstance(request, dict):
+            raise ProtocolError("request must be an object")
+        return request
+
+    def __session(self, request: dict) -> Session:
+        """
+        Returns the session of the request's game.
+        Raises ProtocolError if there is none.
+        """
+        id = request.get("game")
+        if not isinstance(id, int) or isinstance(id, bool):
+            raise ProtocolError("game must be an integer")
+        if id not in self.sessions:
+            raise ProtocolError("no game {}".format(id))
+        return self.sessions[id]
+
+    async def __dispatch(self, request: dict, writer: asyncio.StreamWriter, watching: set) -> dict:
+        op = request.get("op")
+        if op == "new":
+            session = self.newSession()
+            session.watchers.add(writer)
+            watching.add(session.id)
+            return {"ok": True, **session.state()}
+        if op in ("join", "state"):
+            session = self.__session(request)
+            if op == "join":
+                session.watchers.add(writer)
+                watching.add(session.id)
+            return {"ok": True, **session.state()}
+        if op == "move":
+            session = self.__session(request)
+            if not isinstance(request.get("move"), str):
+                raise ProtocolError("move must be a string")
+            return await self.__move(session, request["move"], writer)
+        if op == "leave":
+            session = self.__session(request)
+            session.watchers.discard(writer)
+            watching.discard(session.id)
+            return {"ok": True, "game": session.id}
+        if op == "close":
+            session = self.sessions.pop(self.__session(request).id)
+            return {"ok": True, "game": session.id}
+        raise ProtocolError("unknown op {}".format(op))
+
+    async def __move(self, session: Session, text: str, writer: asyncio.StreamWriter) -> dict:
+        """
+        Plays a move and pushes the changed squares to
+        the other watchers of the game.
+        """
+        game = session.getGame()
+        if game.endGame:
+            raise ProtocolError("game {} is over".format(session.id))
+        move = pdn.parseMove(text, game.legalMoves())
+        before = squaresOf(game)
+        game.playMove(move)
+        after = squaresOf(game)
+        session.ply += 1
+        self.moves += 1
+        diff = {
+            "event": "diff",
+            "game": session.id,
+            "ply": session.ply,
+            "squares": {square: after.get(square) for square in before.keys() | after.keys()
+                        if before.get(square) != after.get(square)},
+            **session.status(game),
+        }
+        line = json.dumps(diff, separators=(",", ":")).encode() + b"\n"
+        for watcher in list(session.watchers):
+            if watcher is not writer:
+                watcher.write(line)
+        return {"ok": True, **diff}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Checkers game server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--idle", type=float, default=IDLE_TIMEOUT, help="seconds before parking a session")
+    args = parser.parse_args()
+    server = GameServer(args.host, args.port, args.idle)
+    try:
+        asyncio.run(server.serveForever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Endgame tablebases. Solves every position with few pieces by
+retrograde analysis and stores its win/loss/draw value, from the
+side to move's view, in 2 bits per position. Each material signature
+is one file under the tablebase directory, read through mmap.
+
+Usage: python -m checkers.tablebase [--pieces N] [--workers N] [--out DIR]
+"""
+import os
+import sys
+import mmap
+import time
+import argparse
+import multiprocessing
+from array import array
+from math import comb
+from itertools import combinations
+from .bitboard import Position, SQUARES, PROMOTION, FULL, squares
+from .constants import PLAYER_RED, PLAYER_WHITE
+
+# Values, from the side to move's view. UNKNOWN marks index slots
+# that are not positions.
+UNKNOWN, WIN, LOSS, DRAW = 0, 1, 2, 3
+VALUE_NAMES = {UNKNOWN: "unknown", WIN: "win", LOSS: "loss", DRAW: "draw"}
+
+MAGIC = b"WDL1"
+HEADER_SIZE = len(MAGIC) + 4 # Magic, then the four piece counts
+PIECES = 3 # Default largest piece count
+
+# Men never stand on their promotion row.
+MAN_SQUARES = {
+    PLAYER_WHITE: FULL & ~PROMOTION[PLAYER_WHITE],
+    PLAYER_RED: FULL & ~PROMOTION[PLAYER_RED],
+}
+RED_MAN_OFFSET = (FULL & ~MAN_SQUARES[PLAYER_RED]).bit_count() # Red men slots start past row 0
+MAN_SLOTS = MAN_SQUARES[PLAYER_WHITE].bit_count()
+
+# Signatures --------------------------------------------------------------
+# A material signature is (white men, white kings, red men, red kings).
+def signatureOf(position: Position) -> tuple:
+    """
+    Returns the material signature of position.
+    """
+    kings = position.kings
+    return ((position.white & ~kings).bit_count(), (position.white & kings).bit_count(),
+            (position.red & ~kings).bit_count(), (position.red & kings).bit_count())
+
+def signatures(pieces: int) -> list:
+    """
+    Returns every signature of at most pieces pieces with pieces on
+    both sides, in solving order: captures lead to fewer pieces and
+    promotions to fewer men, so both come first.
+    """
+    found = []
+    for whiteMen in range(pieces):
+        for whiteKings in range(pieces - whiteMen):
+            for redMen in range(pieces - whiteMen - whiteKings):
+                for redKings in range(pieces - whiteMen - whiteKings - redMen + 1):
+                    signature = (whiteMen, whiteKings, redMen, redKings)
+                    if whiteMen + whiteKings and redMen + redKings:
+                        found.append(signature)
+    return sorted(found, key=lambda s: (sum(s), s[0] + s[2], s))
+
+def stage(signature: tuple) -> tuple:
+    """
+    Returns the solving stage of a signature. Signatures of one
+    stage never lead to each other and are solved in parallel.
+    """
+    whiteMen, whiteKings, redMen, redKings = signature
+    return (sum(signature), whiteMen + redMen)
+
+def fileName(signature: tuple) -> str:
+    return "{}{}{}{}.wdl".format(*signature)
+
+# Indexing ----------------------------------------------------------------
+# Pieces are ranked as combinations, in order: white men among their
+# 28 squares, red men among theirs, white kings among the squares
+# left by the men, red kings among the squares left. Slots where men
+# of both sides overlap are not positions and stay UNKNOWN.
+def rank(slots: list) -> int:
+    """
+    Returns the rank of sorted slots in the combinatorial number system.
+    """
+    return sum(comb(slot, i + 1) for i, slot in enumerate(slots))
+
+def tableSize(signature: tuple) -> int:
+    """
+    Returns the number of index slots of a signature, both sides to move.
+    """
+    whiteMen, whiteKings, redMen, redKings = signature
+    free = SQUARES - whiteMen - redMen
+    return (comb(MAN_SLOTS, whiteMen) * comb(MAN_SLOTS, redMen)
+            * comb(free, whiteKings) * comb(free - whiteKings, redKings) * 2)
+
+def index(position: Position, signature: tuple) -> int:
+    """
+    Returns the index of position in the table of its signature.
+    """
+    whiteMen, whiteKings, redMen, redKings = signature
+    free = SQUARES - whiteMen - redMen
+    kings = position.kings
+    men = (position.white | position.red) & ~kings
+    taken = men | (position.white & kings)
+    whiteSlots = list(squares(position.white & ~kings))
+    redSlots = [square - RED_MAN_OFFSET for square in squares(position.red & ~kings)]
+    whiteKingSlots = [square - (men & ((1 << square) - 1)).bit_count()
+                      for square in squares(position.white & kings)]
+    redKingSlots = [square - (taken & ((1 << square) - 1)).bit_count()
+                    for square in squares(position.red & kings)]
+    value = rank(whiteSlots)
+    value = value * comb(MAN_SLOTS, redMen) + rank(redSlots)
+    value = value * comb(free, whiteKings) + rank(whiteKingSlots)
+    value = value * comb(free - whiteKings, redKings) + rank(redKingSlots)
+    return value * 2 + position.turn
+
+def positions(signature: tuple):
+    """
+    Yields every position of a signature, both sides to move.
+    """
+    whiteMen, whiteKings, redMen, redKings = signature
+    whiteSquares = list(squares(MAN_SQUARES[PLAYER_WHITE]))
+    redSquares = list(squares(MAN_SQUARES[PLAYER_RED]))
+    for whiteSet in combinations(whiteSquares, whiteMen):
+        white = sum(1 << square for square in whiteSet)
+        for redSet in combinations(redSquares, redMen):
+            red = sum(1 << square for square in redSet)
+            if white & red:
+                continue
+            free = [square for square in range(SQUARES) if not (white | red) >> square & 1]
+            for whiteKingSet in combinations(free, whiteKings):
+                whiteKing = sum(1 << square for square in whiteKingSet)
+                left = [square for square in free if not whiteKing >> square & 1]
+                for redKingSet in combinations(left, redKings):
+                    redKing = sum(1 << square for square in redKingSet)
+                    for turn in (PLAYER_RED, PLAYER_WHITE):
+                        yield Position(white | whiteKing, red | redKing, whiteKing | redKing, turn)
+
+class Tablebase:
+    """
+    Read-only access to a tablebase directory. Tables are mapped on
+    first use and probes read the mapping directly, so they allocate
+    nothing and processes probing the same files share the page cache.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        self.__maps: dict = dict()
+        self.pieces: int = 0
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith(".wdl"):
+                    self.pieces = max(self.pieces, sum(int(count) for count in name[:4]))
+
+    def close(self) -> None:
+        for mapping in self.__maps.values():
+            if mapping is not None:
+                mapping.close()
+        self.__maps.clear()
+
+    def __table(self, signature: tuple) -> mmap.mmap|None:
+        """
+        Returns the mapping of a signature's file, or None.
+        """
+        if signature not in self.__maps:
+            path = os.path.join(self.directory, fileName(signature))
+            mapping = None
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if mapping[:HEADER_SIZE] != MAGIC + bytes(signature):
+                    mapping.close()
+                    raise ValueError("{} is not a tablebase of {}".format(path, signature))
+            self.__maps[signature] = mapping
+        return self.__maps[signature]
+
+    def probe(self, position: Position) -> int|None:
+        """
+        Returns the value of position for the side to move,
+        or None if the tablebase does not hold it.
+        """
+        own = position.white if position.turn == PLAYER_WHITE else position.red
+        if not own:
+            return LOSS
+        signature = signatureOf(position)
+        table = self.__table(signature)
+        if table is None:
+            return None
+        slot = index(position, signature)
+        return table[HEADER_SIZE + (slot >> 2)] >> ((slot & 3) << 1) & 3
+
+# Generation --------------------------------------------------------------
+def solve(directory: str, signature: tuple) -> dict:
+    """
+    Solves one signature and writes its file. The tables its
+    captures and promotions lead to must already be in directory.
+    Returns counts of each value.
+    """
+    start = time.perf_counter()
+    tablebase = Tablebase(directory)
+    size = tableSize(signature)
+    values = bytearray(size)
+    pending = array("i", bytes(4 * size)) # Successors not yet known won for the opponent
+    edgeFrom, edgeTo = array("I"), array("I")
+    queue = []
+    for position in positions(signature):
+        slot = index(position, signature)
+        won = drawn = False
+        count = 0
+        for move in position.legalMoves():
+            child = position.play(move)
+            if signatureOf(child) == signature:
+                edgeFrom.append(slot)
+                edgeTo.append(index(child, signature))
+                count += 1
+                continue
+            value = tablebase.probe(child)
+            if value == LOSS:
+                won = True
+                break
+            drawn = drawn or value == DRAW
+        if won:
+            values[slot] = WIN
+            queue.append(slot)
+        elif count == 0 and not drawn:
+            values[slot] = LOSS # No moves, or every move loses
+            queue.append(slot)
+        else:
+            pending[slot] = count + drawn
+    tablebase.close()
+
+    # Predecessor lists, grouped by successor
+    starts = array("I", bytes(4 * (size + 1)))
+    for child in edgeTo:
+        starts[child + 1] += 1
+    for slot in range(size):
+        starts[slot + 1] += starts[slot]
+    fill = array("I", starts)
+    parents = array("I", bytes(4 * len(edgeTo)))
+    for parent, child in zip(edgeFrom, edgeTo):
+        parents[fill[child]] = parent
+        fill[child] += 1
+    del edgeFrom, edgeTo, fill
+
+    # Retrograde propagation: a parent of a loss is a win, a parent
+    # whose successors are all wins is a loss.
+    while queue:
+        slot = queue.pop()
+        lost = values[slot] == LOSS
+        for parent in parents[starts[slot]:starts[slot + 1]]:
+            if values[parent]:
+                continue
+            if lost:
+                values[parent] = WIN
+                queue.append(parent)
+            else:
+                pending[parent] -= 1
+                if pending[parent] == 0:
+                    values[parent] = LOSS
+                    queue.append(parent)
+
+    counts = {name: 0 for name in VALUE_NAMES.values()}
+    packed = bytearray((size + 3) // 4)
+    for position in positions(signature):
+        slot = index(position, signature)
+        value = values[slot] or DRAW # Never resolved: neither side can force a result
+        counts[VALUE_NAMES[value]] += 1
+        packed[slot >> 2] |= value << ((slot & 3) << 1)
+    path = os.path.join(directory, fileName(signature))
+    with open(path + ".tmp", "wb") as file:
+        file.write(MAGIC + bytes(signature))
+        file.write(packed)
+    os.replace(path + ".tmp", path)
+    del counts["unknown"]
+    return {"signature": signature, "positions": sum(counts.values()), **counts,
+            "bytes": HEADER_SIZE + len(packed), "seconds": round(time.perf_counter() - start, 2)}
+
+def solveTask(task: tuple) -> dict:
+    """
+    Pool task: solve() of a (directory, signature) task.
+    """
+    return solve(*task)
+
+def generate(directory: str, pieces: int = PIECES, workers: int = 1, progress=None) -> list:
+    """
+    Generates every table of at most pieces pieces into directory,
+    solving the signatures of each stage across workers processes.
+    Tables already present are kept. Returns the solving reports.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stages = dict()
+    for signature in signatures(pieces):
+        if not os.path.exists(os.path.join(directory, fileName(signature))):
+            stages.setdefault(stage(signature), []).append(signature)
+    reports = []
+    with multiprocessing.Pool(workers) as pool:
+        for key in sorted(stages):
+            tasks = [(directory, signature) for signature in stages[key]]
+            for report in pool.imap_unordered(solveTask, tasks):
+                reports.append(report)
+                if progress is not None:
+                    progress(report)
+    return reports
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Endgame tablebase generation.")
+    parser.add_argument("--pieces", type=int, default=PIECES)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--out", default="tablebase", help="tablebase directory")
+    args = parser.parse_args()
+
+    print("{:<10} {:>9} {:>9} {:>9} {:>9} {:>9} {:>8}".format(
+        "signature", "positions", "wins", "losses", "draws", "bytes", "seconds"))
+    def progress(report: dict) -> None:
+        print("{:<10} {:>9} {:>9} {:>9} {:>9} {:>9} {:>8.2f}".format(
+            fileName(report["signature"])[:4], report["positions"], report["win"],
+            report["loss"], report["draw"], report["bytes"], report["seconds"]), flush=True)
+    start = time.perf_counter()
+    reports = generate(args.out, args.pieces, args.workers, progress)
+    print("{} tables in {:.1f}s".format(len(reports), time.perf_counter() - start))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
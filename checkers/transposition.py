@@ -0,0 +1,104 @@
+from array import array
+
+# Bounds of a stored score
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Entry layout of the packed data word, least significant bits first:
+# best move origin (6), target (6), captured bitboard (32),
+# depth (8), bound (2), age (8).
+MOVE_BITS = 44
+DEPTH_SHIFT = MOVE_BITS
+BOUND_SHIFT = DEPTH_SHIFT + 8
+AGE_SHIFT = BOUND_SHIFT + 2
+NO_MOVE = (1 << 6) - 1 # Origin value meaning "no best move"
+
+class TranspositionTable:
+    """
+    Fixed size hash table of search results keyed by Zobrist hash.
+    Storage is preallocated in flat arrays (20 bytes per entry), so
+    memory stays capped however long the table is used.
+    Entries go in buckets of two slots: the first keeps the deepest
+    result of the current search, the second is always replaced.
+    Results of older searches are replaced first (aging).
+    """
+
+    ENTRY_SIZE = 8 + 8 + 4 # key, packed data, score
+
+    def __init__(self, megabytes: float = 16) -> None:
+        buckets = max(1, int(megabytes * 1024 * 1024) // (2 * self.ENTRY_SIZE))
+        self.size: int = 1 << (buckets.bit_length() - 1) # Power of two buckets
+        self.__mask: int = self.size - 1
+        self.__keys = array("Q", bytes(8 * 2 * self.size))
+        self.__data = array("Q", bytes(8 * 2 * self.size))
+        self.__scores = array("i", bytes(4 * 2 * self.size))
+        self.age: int = 0
+        self.probes: int = 0
+        self.hits: int = 0
+        self.stores: int = 0
+
+    def memory(self) -> int:
+        """
+        Returns the memory held by the table, in bytes.
+        """
+        return 2 * self.size * self.ENTRY_SIZE
+
+    def clear(self) -> None:
+        """
+        Empties the table.
+        """
+        self.__keys = array("Q", bytes(8 * 2 * self.size))
+        self.__data = array("Q", bytes(8 * 2 * self.size))
+        self.__scores = array("i", bytes(4 * 2 * self.size))
+        self.age = self.probes = self.hits = self.stores = 0
+
+    def newSearch(self) -> None:
+        """
+        Starts a new search: entries of previous
+        searches become preferred for replacement.
+        """
+        self.age = (self.age + 1) & 0xff
+
+    # Entries -----------------------------------------------------------------
+    def probe(self, key: int) -> tuple|None:
+        """
+        Returns (depth, bound, score, move) stored for key, or
+        None. move is an (origin, target, captured) bitboard
+        move, or None.
+        """
+        self.probes += 1
+        slot = (key & self.__mask) << 1
+        key |= 1 # Zero marks an empty slot
+        for i in (slot, slot + 1):
+            if self.__keys[i] == key:
+                self.hits += 1
+                data = self.__data[i]
+                origin = data & 0x3f
+                move = None
+                if origin != NO_MOVE:
+                    move = (origin, data >> 6 & 0x3f, data >> 12 & 0xffffffff)
+                return (data >> DEPTH_SHIFT & 0xff, data >> BOUND_SHIFT & 0x3,
+                        self.__scores[i], move)
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: tuple|None) -> None:
+        """
+        Stores a search result for key.
+        """
+        self.stores += 1
+        slot = (key & self.__mask) << 1
+        key |= 1
+        data = self.__data[slot]
+        if (self.__keys[slot] == key or self.__keys[slot] == 0
+                or data >> AGE_SHIFT != self.age or depth >= data >> DEPTH_SHIFT & 0xff):
+            index = slot # Depth-preferred slot
+        else:
+            index = slot + 1 # Always-replace slot
+        if move is None:
+            packed = NO_MOVE
+        else:
+            origin, target, captured = move
+            packed = origin | target << 6 | captured << 12
+        self.__keys[index] = key
+        self.__data[index] = (packed | min(depth, 0xff) << DEPTH_SHIFT
+                              | bound << BOUND_SHIFT | self.age << AGE_SHIFT)
+        self.__scores[index] = score
@@ -0,0 +1,37 @@
+import random
+from .constants import ROWS, COLS, PLAYER_WHITE
+
+# Zobrist keys: one random 64-bit number per (piece kind, square) and
+# one for white to move. A position's hash is the XOR of the keys of
+# its pieces, so moving, capturing or promoting a piece updates it
+# with a couple of XORs. Keys are seeded, hashes are stable across runs.
+SEED = 0x5EED
+KINDS = 4 # red man, red king, white man, white king
+
+__rng = random.Random(SEED)
+PIECE_KEYS = [[__rng.getrandbits(64) for _ in range(ROWS * COLS)] for _ in range(KINDS)]
+TURN_KEY = __rng.getrandbits(64)
+__sizeKeys: dict = {COLS: PIECE_KEYS} # Board size -> piece keys
+
+def pieceKind(player: int, king: bool) -> int:
+    """
+    Returns the index of a piece kind in PIECE_KEYS.
+    """
+    return 2 * player + int(king)
+
+def pieceKeys(size: int) -> list:
+    """
+    Returns the piece keys of a size x size board, indexed
+    as PIECE_KEYS by kind and row * size + col. Other sizes
+    than the default one get keys of their own seed.
+    """
+    if size not in __sizeKeys:
+        rng = random.Random(SEED + size)
+        __sizeKeys[size] = [[rng.getrandbits(64) for _ in range(size * size)] for _ in range(KINDS)]
+    return __sizeKeys[size]
+
+def turnKey(player: int) -> int:
+    """
+    Returns the key of the player to move.
+    """
+    return TURN_KEY if player == PLAYER_WHITE else 0
@@ -1,9 +1,18 @@
 import sys
+import time
 import pygame; pygame.init()
 from checkers.game import Game
-from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE
+from checkers.gui import GameView, FrameStats
+from checkers.search import Search
+from checkers.mcts import Mcts
+from checkers.book import OpeningBook, BookPlayer, BOOK_PATH
+from checkers.transposition import TranspositionTable
+from checkers.bitboard import Position, toMove
+from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, PLAYER_WHITE
 
 FPS = 60
+AI_PLAYER = PLAYER_WHITE # Computer side when started with --ai
+AI_TIME = 1.0 # Seconds per computer move
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption('Checkers')
@@ -18,24 +27,58 @@ def clickToBoardCoordinates() -> tuple:
 def main():
     run = True
     clock = pygame.time.Clock()
+    eventDriven = "--events" in sys.argv[1:] # Sleep until an event instead of ticking at FPS
+    stats = FrameStats() if "--frame-stats" in sys.argv[1:] else None
 
-    game = Game(win = WIN)
+    game = Game()
+    view = GameView(game = game, win = WIN)
+    engine = None
+    if "--ai" in sys.argv[1:]:
+        book = OpeningBook(BOOK_PATH) if "--book" in sys.argv[1:] else None
+        if "--mcts" in sys.argv[1:]:
+            search = Mcts(maxPlayouts = None, maxTime = AI_TIME)
+        else:
+            search = Search(maxTime = AI_TIME, table = TranspositionTable())
+        engine = BookPlayer(book, search)
 
     while run:
-        clock.tick(FPS)
+        engineToMove = engine is not None and game.turn == AI_PLAYER and not game.endGame
+        start = time.perf_counter()
+        if eventDriven and not engineToMove:
+            events = [pygame.event.wait()] + pygame.event.get()
+        else:
+            clock.tick(FPS)
+            events = pygame.event.get()
+        idleEnd = time.perf_counter()
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 run = False
 
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWSHOWN):
+                view.invalidate()
+
             if event.type == pygame.MOUSEBUTTONDOWN:
-                coords = clickToBoardCoordinates()
-                print(coords)
-                game.runGame(coords)
-        
-        game.updateGui()
-        pygame.display.update()
+                game.runGame(clickToBoardCoordinates())
+        eventsEnd = time.perf_counter()
+
+        if engineToMove:
+            move = engine.chooseMove(Position.fromBoard(game.board, game.turn))
+            game.playMove(toMove(move))
+        engineEnd = time.perf_counter()
+
+        rects = view.updateGui()
+        updateEnd = time.perf_counter()
+        if rects:
+            pygame.display.update(rects)
+        displayEnd = time.perf_counter()
+
+        if stats is not None:
+            stats.addFrame(idleEnd - start, (eventsEnd - idleEnd, engineEnd - eventsEnd,
+                                             updateEnd - engineEnd, displayEnd - updateEnd), bool(rects))
 
+    if stats is not None:
+        stats.dump(sys.stdout)
     pygame.quit()
     sys.exit()
 